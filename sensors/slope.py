@@ -96,16 +96,16 @@ def build_slope_entities(hass: HomeAssistant, entry: ConfigEntry) -> Tuple[List[
     telemetry = _entry_section(entry, "telemetry", [])
 
     room_map: Dict[str, str] = {}
+    default_sources: List[str] = []
     for item in telemetry:
         if item.get("sensor_type") != "temperature":
             continue
-        room = item.get("room") or item.get("friendly_name") or item.get("entity_id")
-        room_map[item.get("entity_id")] = room
+        entity_id = item.get("entity_id")
+        room_map[entity_id] = item.get("room") or item.get("friendly_name") or entity_id
+        default_sources.append(entity_id)
 
     if mode == SLOPE_MODE_PROVIDED:
-        source_entities: List[str] = slope_cfg.get("source_entities", [])
-        if not source_entities:
-            source_entities = [item.get("entity_id") for item in telemetry if item.get("sensor_type") == "temperature"]
+        source_entities: List[str] = slope_cfg.get("source_entities") or default_sources
         provided_sensors: List[str] = slope_cfg.get("provided_sensors", [])
         source_to_slope = _match_provided_sensors_to_sources(
             hass,
@@ -126,8 +126,9 @@ def build_slope_entities(hass: HomeAssistant, entry: ConfigEntry) -> Tuple[List[
 
     for entity_id in sources:
         room_name = room_map.get(entity_id, entity_id)
-        object_id = room_name.lower().replace(" ", "_")
-        unique_id = f"hi_{entry.entry_id}_slope_{object_id}"
+        object_id = slugify(room_name)
+        # unique_id keeps the historical key so existing registry entries survive.
+        unique_id = f"hi_{entry.entry_id}_slope_{room_name.lower().replace(' ', '_')}"
         name = f"HI {room_name} Temperature Slope"
         sensor = HISlopeSensor(hass, name, unique_id, entity_id, tracker)
         sensors.append(sensor)
@@ -150,9 +151,21 @@ def build_slope_entities(hass: HomeAssistant, entry: ConfigEntry) -> Tuple[List[
         tracker.record(entity_id, value)
         return True
 
-    def _refresh_sensors() -> None:
-        for sensor in sensors:
+    sensors_by_source: Dict[str, List[HISlopeSensor]] = {}
+    for sensor in sensors:
+        sensors_by_source.setdefault(sensor._source, []).append(sensor)
+
+    def _refresh_sensors(updated_sources: List[str]) -> None:
+        # Only touch sensors whose source gained a sample, and update them all
+        # before writing so the state machine sees one consistent batch.
+        updated = [
+            sensor
+            for source in updated_sources
+            for sensor in sensors_by_source.get(source, [])
+        ]
+        for sensor in updated:
             sensor.update_from_hass()
+        for sensor in updated:
             sensor.async_write_ha_state()
 
     for source in sources:
@@ -160,18 +173,15 @@ def build_slope_entities(hass: HomeAssistant, entry: ConfigEntry) -> Tuple[List[
 
     async def _handle_change(event) -> None:
         entity_id = event.data.get("entity_id")
-        if entity_id not in sources:
+        if entity_id not in sensors_by_source:
             return
         if _record_state(entity_id):
-            _refresh_sensors()
+            _refresh_sensors([entity_id])
 
     async def _periodic_sample(now) -> None:
-        updated = False
-        for source in sources:
-            if _record_state(source):
-                updated = True
-        if updated:
-            _refresh_sensors()
+        updated_sources = [source for source in sources if _record_state(source)]
+        if updated_sources:
+            _refresh_sensors(updated_sources)
 
     unsub_state = async_track_state_change_event(hass, sources, _handle_change)
     unsub_periodic = async_track_time_interval(hass, _periodic_sample, SAMPLE_INTERVAL)
@@ -197,13 +207,17 @@ def _match_provided_sensors_to_sources(
 
     unmatched = [sensor for sensor in provided_sensors if isinstance(sensor, str)]
     mapping: Dict[str, str] = {}
+    # Resolve each sensor's state and token key once instead of per source.
+    token_keys = {
+        sensor: _sensor_token_key(sensor, hass.states.get(sensor)) for sensor in unmatched
+    }
 
     for source in source_entities:
         room_name = room_map.get(source, source)
         room_key = slugify(room_name) or ""
         selected = None
         for sensor_entity in unmatched:
-            if _matches_room(hass, sensor_entity, room_key):
+            if _matches_room(token_keys[sensor_entity], room_key):
                 selected = sensor_entity
                 break
         if not selected and unmatched:
@@ -215,15 +229,17 @@ def _match_provided_sensors_to_sources(
     return mapping
 
 
-def _matches_room(hass: HomeAssistant, entity_id: str, room_key: str) -> bool:
-    if not room_key:
-        return False
-    state = hass.states.get(entity_id)
+def _sensor_token_key(entity_id: str, state: Any) -> str:
     friendly = ""
     if state:
         friendly = str(state.attributes.get("friendly_name", ""))
     token_source = " ".join([entity_id, friendly])
-    token_key = slugify(re.sub(r"[^A-Za-z0-9]+", " ", token_source))
+    return slugify(re.sub(r"[^A-Za-z0-9]+", " ", token_source))
+
+
+def _matches_room(token_key: str, room_key: str) -> bool:
+    if not room_key:
+        return False
     return bool(token_key and (room_key in token_key or token_key in room_key))
 
 
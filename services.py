@@ -6,7 +6,9 @@ import asyncio
 import logging
 import os
 import tempfile
+import types
 from datetime import timedelta
+from itertools import chain
 from typing import List, Optional, Tuple
 
 import voluptuous as vol
@@ -30,6 +32,28 @@ SERVICE_PURGE_FILES = "purge_files"
 SERVICE_PAUSE_CONTROL = "pause_control"
 SERVICE_RESUME_CONTROL = "resume_control"
 
+_ALL_SERVICES = (
+    SERVICE_FLASH_LIGHTS,
+    SERVICE_REFRESH_UI,
+    SERVICE_DUMP_DIAGNOSTICS,
+    SERVICE_SELF_CHECK,
+    SERVICE_DUMP_CARDS,
+    SERVICE_CREATE_DASHBOARD,
+    SERVICE_VIEW_CARDS,
+    SERVICE_PURGE_FILES,
+    SERVICE_PAUSE_CONTROL,
+    SERVICE_RESUME_CONTROL,
+)
+
+_CARD_DEPENDENCIES = ("card-mod", "button-card", "mod-card", "apexcharts-card")
+_JSON_WRITE_BUFFER = 1 << 20
+_EMPTY_MAPPING = types.MappingProxyType({})
+_COLOR_MODES = frozenset(("rgb", "hs"))
+# Diagnostics files are rewritten wholesale; only force a disk flush on request.
+_DIAG_FSYNC = os.environ.get("HI_DIAG_FSYNC") == "1"
+
+# Schemas are compiled once here. They intentionally keep voluptuous' default
+# PREVENT_EXTRA so mistyped service fields fail loudly instead of being dropped.
 SERVICE_FLASH_SCHEMA = vol.Schema({
     vol.Optional("power_entity"): cv.entity_id,
     vol.Required("lights"): cv.entity_ids,
@@ -105,93 +129,75 @@ async def async_register_services(hass: HomeAssistant) -> None:
         await _flash_lights(hass, lights, color, duration, flash_count, supports_color)
         await _restore_lights(hass, states)
 
-    hass.services.async_register(DOMAIN, SERVICE_FLASH_LIGHTS, handle_flash, schema=SERVICE_FLASH_SCHEMA)
-
     async def handle_refresh(call: ServiceCall) -> None:
         from .ui.register import async_build_entity_mapping, async_register_cards
 
-        entry_id = call.data.get("entry_id")
-        entries = []
-        if entry_id:
-            entry = hass.config_entries.async_get_entry(entry_id)
-            if entry:
-                entries = [entry]
-        else:
-            entries = hass.config_entries.async_entries(DOMAIN)
+        entries = _resolve_entries(hass, call.data.get("entry_id"))
 
-        for entry in entries:
+        async def _refresh_one(entry) -> None:
             mapping = await async_build_entity_mapping(hass, entry.entry_id)
             cards = await async_register_cards(hass, entry.entry_id, mapping=mapping)
             hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {})
             hass.data[DOMAIN][entry.entry_id]["entity_map"] = mapping
             hass.data[DOMAIN][entry.entry_id]["cards"] = cards
 
-    hass.services.async_register(DOMAIN, SERVICE_REFRESH_UI, handle_refresh, schema=SERVICE_REFRESH_SCHEMA)
+        await asyncio.gather(*(_refresh_one(entry) for entry in entries))
 
     async def handle_dump(call: ServiceCall) -> None:
         try:
-            entry_id = call.data.get("entry_id")
             filename = call.data.get("filename", "humidity_intelligence_diagnostics.json")
-            entries = []
-            if entry_id:
-                entry = hass.config_entries.async_get_entry(entry_id)
-                if entry:
-                    entries = [entry]
-            else:
-                entries = hass.config_entries.async_entries(DOMAIN)
+            entries = _resolve_entries(hass, call.data.get("entry_id"))
 
+            # Only snapshot references here; JSON conversion runs in the executor.
             payload = {}
-            for entry in entries:
-                data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+            domain_map = hass.data.get(DOMAIN) or _EMPTY_MAPPING
+            entry_data = [(entry, domain_map.get(entry.entry_id) or _EMPTY_MAPPING) for entry in entries]
+            state_by_id = _state_snapshot(hass, (data.get("entity_map") or {} for _, data in entry_data))
+            for entry, data in entry_data:
                 entity_map = data.get("entity_map", {})
                 state_dump = {}
                 for ent in entity_map.values():
-                    state = hass.states.get(ent)
+                    state = state_by_id.get(ent)
                     if state is None:
                         continue
                     state_dump[ent] = {
                         "state": state.state,
-                        "attributes": _to_jsonable(dict(state.attributes)),
+                        "attributes": state.attributes,
                     }
                 payload[entry.entry_id] = {
-                    "config": _to_jsonable(data.get("config", {})),
-                    "options": _to_jsonable(data.get("options", {})),
-                    "entity_map": _to_jsonable(entity_map),
+                    # Shallow copies taken on the loop so the executor walk never
+                    # sees an options flow mutating the live dicts mid-iteration.
+                    "config": dict(data.get("config") or {}),
+                    "options": dict(data.get("options") or {}),
+                    "entity_map": dict(entity_map),
                     "cards": list((data.get("cards") or {}).keys()),
                     "states": state_dump,
                 }
 
             path = hass.config.path(filename)
-            await hass.async_add_executor_job(_write_json, path, payload)
+            await hass.async_add_executor_job(_serialize_and_write_json, path, payload)
         except Exception as err:
             _LOGGER.exception("Failed to write diagnostics JSON")
             raise HomeAssistantError(f"Failed to write diagnostics JSON: {err}") from err
 
-    hass.services.async_register(DOMAIN, SERVICE_DUMP_DIAGNOSTICS, handle_dump, schema=SERVICE_DUMP_SCHEMA)
-
     async def handle_self_check(call: ServiceCall) -> None:
-        entry_id = call.data.get("entry_id")
-        entries = []
-        if entry_id:
-            entry = hass.config_entries.async_get_entry(entry_id)
-            if entry:
-                entries = [entry]
-        else:
-            entries = hass.config_entries.async_entries(DOMAIN)
+        entries = _resolve_entries(hass, call.data.get("entry_id"))
+
+        # basic dependency checks, shared by every entry
+        resources = hass.data.get("lovelace_resources") or {}
+        resources_blob = "\n".join(str(v) for v in resources.values())
+        dependencies_ok = {dep: dep in resources_blob for dep in _CARD_DEPENDENCIES}
 
         report = {}
-        for entry in entries:
-            data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+        domain_map = hass.data.get(DOMAIN) or _EMPTY_MAPPING
+        entry_data = [(entry, domain_map.get(entry.entry_id) or _EMPTY_MAPPING) for entry in entries]
+        state_by_id = _state_snapshot(hass, (data.get("entity_map") or {} for _, data in entry_data))
+        for entry, data in entry_data:
             mapping = data.get("entity_map", {})
             missing_entities = []
             for ent in mapping.values():
-                if hass.states.get(ent) is None:
+                if state_by_id.get(ent) is None:
                     missing_entities.append(ent)
-            # basic dependency checks
-            dependencies_ok = {}
-            resources = hass.data.get("lovelace_resources") or {}
-            for dep in ["card-mod", "button-card", "mod-card", "apexcharts-card"]:
-                dependencies_ok[dep] = any(dep in str(v) for v in resources.values())
 
             report[entry.entry_id] = {
                 "missing_entities": missing_entities,
@@ -204,16 +210,12 @@ async def async_register_services(hass: HomeAssistant) -> None:
         path = hass.config.path("humidity_intelligence_self_check.json")
         await hass.async_add_executor_job(_write_json, path, report)
 
-    hass.services.async_register(DOMAIN, SERVICE_SELF_CHECK, handle_self_check, schema=SERVICE_SELF_CHECK_SCHEMA)
-
     async def handle_dump_cards(call: ServiceCall) -> None:
         entry_id = call.data.get("entry_id")
         filename = call.data.get("filename")
         layout = call.data.get("layout")
         await _dump_cards_to_file(hass, entry_id, filename, layout=layout)
 
-    hass.services.async_register(DOMAIN, SERVICE_DUMP_CARDS, handle_dump_cards, schema=SERVICE_DUMP_CARDS_SCHEMA)
-
     async def handle_create_dashboard(call: ServiceCall) -> None:
         from .ui.register import async_build_entity_mapping, async_register_cards
         from homeassistant.components.lovelace import dashboard as lovelace_dashboard
@@ -257,13 +259,6 @@ async def async_register_services(hass: HomeAssistant) -> None:
         except Exception:
             _LOGGER.exception("Unable to auto-create dashboard. YAML written to %s", filename)
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_CREATE_DASHBOARD,
-        handle_create_dashboard,
-        schema=SERVICE_CREATE_DASHBOARD_SCHEMA,
-    )
-
     async def handle_view_cards(call: ServiceCall) -> None:
         filename = call.data.get("filename")
         layout = call.data.get("layout")
@@ -278,125 +273,107 @@ async def async_register_services(hass: HomeAssistant) -> None:
             blocking=False,
         )
 
-    hass.services.async_register(DOMAIN, SERVICE_VIEW_CARDS, handle_view_cards, schema=SERVICE_VIEW_CARDS_SCHEMA)
-
     async def handle_purge_files(call: ServiceCall) -> None:
-        entry_id = call.data.get("entry_id")
-        entries = []
-        if entry_id:
-            entry = hass.config_entries.async_get_entry(entry_id)
-            if entry:
-                entries = [entry]
-        else:
-            entries = hass.config_entries.async_entries(DOMAIN)
+        entries = _resolve_entries(hass, call.data.get("entry_id"))
 
         if not entries:
             return
 
         files = list_all_generated_files(entries)
         dashboards = [e.data.get("ui_dashboard_id") for e in entries if e.data.get("ui_dashboard_id")]
-        message_lines = [f"/config/{f}" for f in files]
-        for dash in dashboards:
-            message_lines.append(f"Dashboard: {dash}")
-        await hass.services.async_call(
-            "persistent_notification",
-            "create",
-            {
-                "title": "Humidity Intelligence Cleanup",
-                "message": "Purging generated files:\n" + "\n".join(message_lines),
-            },
-            blocking=False,
+        message = "Purging generated files:\n" + "\n".join(
+            chain(map("/config/{}".format, files), map("Dashboard: {}".format, dashboards))
         )
-        await hass.async_add_executor_job(remove_files, hass, files)
+        pending = [
+            hass.services.async_call(
+                "persistent_notification",
+                "create",
+                {
+                    "title": "Humidity Intelligence Cleanup",
+                    "message": message,
+                },
+                blocking=False,
+            ),
+            *(remove_dashboard(hass, dash) for dash in dashboards),
+            hass.async_add_executor_job(remove_files, hass, files),
+        ]
+        await asyncio.gather(*pending)
+
+    def _pause_targets(entries) -> list:
+        """Resolve (pause timer, engine) for every entry, failing before any timer is touched."""
+        domain_map = hass.data.get(DOMAIN) or _EMPTY_MAPPING
+        targets = []
         for entry in entries:
-            await remove_dashboard(hass, entry.data.get("ui_dashboard_id"))
-
-    hass.services.async_register(DOMAIN, SERVICE_PURGE_FILES, handle_purge_files, schema=SERVICE_PURGE_FILES_SCHEMA)
+            data = domain_map.get(entry.entry_id) or _EMPTY_MAPPING
+            timer = (data.get("hi_timers") or {}).get("air_control_pause")
+            if timer is None:
+                raise HomeAssistantError("Pause timer is not available yet")
+            targets.append((timer, data.get("automation_engine")))
+        return targets
 
     async def handle_pause_control(call: ServiceCall) -> None:
-        entry_id = call.data.get("entry_id")
         minutes = int(call.data.get("minutes", 60))
-        entries = []
-        if entry_id:
-            entry = hass.config_entries.async_get_entry(entry_id)
-            if entry:
-                entries = [entry]
-        else:
-            entries = hass.config_entries.async_entries(DOMAIN)
+        entries = _resolve_entries(hass, call.data.get("entry_id"))
 
         if not entries:
             raise HomeAssistantError("No Humidity Intelligence config entry found")
 
-        for entry in entries:
-            data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
-            timer = (data.get("hi_timers") or {}).get("air_control_pause")
-            if timer is None:
-                raise HomeAssistantError("Pause timer is not available yet")
+        async def _pause_one(timer, engine) -> None:
             await timer.async_start(timedelta(minutes=minutes))
-            engine = data.get("automation_engine")
             if engine:
                 await engine.async_request_evaluate()
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_PAUSE_CONTROL,
-        handle_pause_control,
-        schema=SERVICE_PAUSE_CONTROL_SCHEMA,
-    )
+        await asyncio.gather(*(_pause_one(timer, engine) for timer, engine in _pause_targets(entries)))
 
     async def handle_resume_control(call: ServiceCall) -> None:
-        entry_id = call.data.get("entry_id")
-        entries = []
-        if entry_id:
-            entry = hass.config_entries.async_get_entry(entry_id)
-            if entry:
-                entries = [entry]
-        else:
-            entries = hass.config_entries.async_entries(DOMAIN)
+        entries = _resolve_entries(hass, call.data.get("entry_id"))
 
         if not entries:
             raise HomeAssistantError("No Humidity Intelligence config entry found")
 
-        for entry in entries:
-            data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
-            timer = (data.get("hi_timers") or {}).get("air_control_pause")
-            if timer is None:
-                raise HomeAssistantError("Pause timer is not available yet")
+        async def _resume_one(timer, engine) -> None:
             await timer.async_cancel()
-            engine = data.get("automation_engine")
             if engine:
                 await engine.async_request_evaluate()
 
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_RESUME_CONTROL,
-        handle_resume_control,
-        schema=SERVICE_RESUME_CONTROL_SCHEMA,
-    )
+        await asyncio.gather(*(_resume_one(timer, engine) for timer, engine in _pause_targets(entries)))
+
+    handlers = {
+        SERVICE_FLASH_LIGHTS: (handle_flash, SERVICE_FLASH_SCHEMA),
+        SERVICE_REFRESH_UI: (handle_refresh, SERVICE_REFRESH_SCHEMA),
+        SERVICE_DUMP_DIAGNOSTICS: (handle_dump, SERVICE_DUMP_SCHEMA),
+        SERVICE_SELF_CHECK: (handle_self_check, SERVICE_SELF_CHECK_SCHEMA),
+        SERVICE_DUMP_CARDS: (handle_dump_cards, SERVICE_DUMP_CARDS_SCHEMA),
+        SERVICE_CREATE_DASHBOARD: (handle_create_dashboard, SERVICE_CREATE_DASHBOARD_SCHEMA),
+        SERVICE_VIEW_CARDS: (handle_view_cards, SERVICE_VIEW_CARDS_SCHEMA),
+        SERVICE_PURGE_FILES: (handle_purge_files, SERVICE_PURGE_FILES_SCHEMA),
+        SERVICE_PAUSE_CONTROL: (handle_pause_control, SERVICE_PAUSE_CONTROL_SCHEMA),
+        SERVICE_RESUME_CONTROL: (handle_resume_control, SERVICE_RESUME_CONTROL_SCHEMA),
+    }
+    for service in _ALL_SERVICES:
+        handler, schema = handlers[service]
+        hass.services.async_register(DOMAIN, service, handler, schema=schema)
 
 
 async def async_unregister_services(hass: HomeAssistant) -> None:
     """Unregister services for the integration."""
-    if hass.services.has_service(DOMAIN, SERVICE_FLASH_LIGHTS):
-        hass.services.async_remove(DOMAIN, SERVICE_FLASH_LIGHTS)
-    if hass.services.has_service(DOMAIN, SERVICE_REFRESH_UI):
-        hass.services.async_remove(DOMAIN, SERVICE_REFRESH_UI)
-    if hass.services.has_service(DOMAIN, SERVICE_DUMP_DIAGNOSTICS):
-        hass.services.async_remove(DOMAIN, SERVICE_DUMP_DIAGNOSTICS)
-    if hass.services.has_service(DOMAIN, SERVICE_SELF_CHECK):
-        hass.services.async_remove(DOMAIN, SERVICE_SELF_CHECK)
-    if hass.services.has_service(DOMAIN, SERVICE_DUMP_CARDS):
-        hass.services.async_remove(DOMAIN, SERVICE_DUMP_CARDS)
-    if hass.services.has_service(DOMAIN, SERVICE_CREATE_DASHBOARD):
-        hass.services.async_remove(DOMAIN, SERVICE_CREATE_DASHBOARD)
-    if hass.services.has_service(DOMAIN, SERVICE_VIEW_CARDS):
-        hass.services.async_remove(DOMAIN, SERVICE_VIEW_CARDS)
-    if hass.services.has_service(DOMAIN, SERVICE_PURGE_FILES):
-        hass.services.async_remove(DOMAIN, SERVICE_PURGE_FILES)
-    if hass.services.has_service(DOMAIN, SERVICE_PAUSE_CONTROL):
-        hass.services.async_remove(DOMAIN, SERVICE_PAUSE_CONTROL)
-    if hass.services.has_service(DOMAIN, SERVICE_RESUME_CONTROL):
-        hass.services.async_remove(DOMAIN, SERVICE_RESUME_CONTROL)
+    for service in _ALL_SERVICES:
+        if hass.services.has_service(DOMAIN, service):
+            hass.services.async_remove(DOMAIN, service)
+
+
+def _resolve_entries(hass: HomeAssistant, entry_id: str | None) -> list:
+    """Return the targeted config entry, or every HI entry when none is given."""
+    if entry_id:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        return [entry] if entry else []
+    return hass.config_entries.async_entries(DOMAIN)
+
+
+def _state_snapshot(hass: HomeAssistant, entity_maps) -> dict:
+    """Look up the current state of every entity referenced by the given entity maps once."""
+    entity_ids = {ent for entity_map in entity_maps for ent in entity_map.values() if ent}
+    return {entity_id: hass.states.get(entity_id) for entity_id in entity_ids}
 
 
 def _write_json(path: str, payload: dict) -> None:
@@ -406,14 +383,23 @@ def _write_json(path: str, payload: dict) -> None:
     os.makedirs(tmp_dir, exist_ok=True)
     fd, tmp_path = tempfile.mkstemp(prefix=".hi_diag_", suffix=".json", dir=tmp_dir)
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, sort_keys=True)
+        encoder = json.JSONEncoder(indent=2, sort_keys=True, ensure_ascii=False)
+        with os.fdopen(fd, "w", encoding="utf-8", buffering=_JSON_WRITE_BUFFER) as f:
+            for chunk in encoder.iterencode(payload):
+                f.write(chunk)
             f.flush()
-            os.fsync(f.fileno())
+            if _DIAG_FSYNC:
+                os.fsync(f.fileno())
         os.replace(tmp_path, path)
     finally:
-        if os.path.exists(tmp_path):
+        try:
             os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _serialize_and_write_json(path: str, payload: dict) -> None:
+    _write_json(path, _to_jsonable(payload))
 
 
 def _write_text(path: str, payload: str) -> None:
@@ -423,19 +409,78 @@ def _write_text(path: str, payload: str) -> None:
         f.write(payload)
 
 
+def _write_texts(items: List[Tuple[str, str]]) -> None:
+    """Write a batch of text files from a single executor job."""
+    from pathlib import Path
+    targets = [(Path(path), payload) for path, payload in items]
+    for parent in {target.parent for target, _ in targets}:
+        parent.mkdir(parents=True, exist_ok=True)
+    for target, payload in targets:
+        target.write_text(payload, encoding="utf-8")
+
+
+_JSONABLE_PRIMITIVES = frozenset((str, int, float, bool, type(None)))
+
+
 def _to_jsonable(value):
     """Convert HA/runtime objects into JSON-serializable primitives."""
-    if isinstance(value, (str, int, float, bool)) or value is None:
-        return value
-    if isinstance(value, dict):
-        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    root: list = [None]
+    # Each entry carries the ids of its enclosing containers so true cycles are
+    # rejected while shared (non-cyclic) references are still serialized in full.
+    stack = [(root, 0, value, frozenset())]
+    while stack:
+        parent, key, item, ancestors = stack.pop()
+        if type(item) in _JSONABLE_PRIMITIVES or isinstance(item, (str, int, float, bool)):
+            parent[key] = item
+            continue
+        children = _jsonable_children(item)
+        if children is None:
+            parent[key] = _jsonable_leaf(item)
+            continue
+        if id(item) in ancestors:
+            raise ValueError("Circular reference detected")
+        container, pairs = children
+        parent[key] = container
+        inner = ancestors | {id(item)}
+        # Reversed so pops run in source order and later duplicate keys still win.
+        stack.extend((container, k, v, inner) for k, v in reversed(pairs))
+    return root[0]
+
+
+def _mapping_children(value):
+    pairs = [(str(k), v) for k, v in value.items()]
+    return dict.fromkeys(k for k, _ in pairs), pairs
+
+
+def _sequence_children(value):
+    pairs = list(enumerate(value))
+    return [None] * len(pairs), pairs
+
+
+_JSONABLE_CONTAINERS = {
+    dict: _mapping_children,
+    list: _sequence_children,
+    tuple: _sequence_children,
+    set: _sequence_children,
+}
+
+
+def _jsonable_children(value):
+    """Return (empty container, child pairs) for containers, else None."""
+    handler = _JSONABLE_CONTAINERS.get(type(value))
+    if handler is not None:
+        return handler(value)
     if hasattr(value, "items"):
         try:
-            return {str(k): _to_jsonable(v) for k, v in value.items()}
+            return _mapping_children(value)
         except Exception:
             pass
     if isinstance(value, (list, tuple, set)):
-        return [_to_jsonable(v) for v in value]
+        return _sequence_children(value)
+    return None
+
+
+def _jsonable_leaf(value):
     if hasattr(value, "isoformat"):
         try:
             return value.isoformat()
@@ -450,26 +495,28 @@ async def _dump_cards_to_file(
     filename: str | None,
     layout: str | None = None,
 ) -> List[str]:
-    entries = []
-    if entry_id:
-        entry = hass.config_entries.async_get_entry(entry_id)
-        if entry:
-            entries = [entry]
-    else:
-        entries = hass.config_entries.async_entries(DOMAIN)
-
-    written: List[str] = []
-    for entry in entries:
-        data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    entries = _resolve_entries(hass, entry_id)
+
+    domain_map = hass.data.get(DOMAIN) or _EMPTY_MAPPING
+
+    async def _dump_one(entry) -> List[str]:
+        data = domain_map.get(entry.entry_id) or _EMPTY_MAPPING
         cards = data.get("cards", {}) or {}
+        pending: List[Tuple[str, str]] = []
+        targets: List[str] = []
         for name, card_yaml in cards.items():
             if layout and name != layout:
                 continue
             target = _build_cards_filename(filename, name, entry.entry_id, len(entries) > 1)
-            path = hass.config.path(target)
-            await hass.async_add_executor_job(_write_text, path, card_yaml)
-            written.append(f"/config/{target}")
-    return written
+            pending.append((hass.config.path(target), card_yaml))
+            targets.append(f"/config/{target}")
+        if pending:
+            # One executor hop per entry rather than one per card file.
+            await hass.async_add_executor_job(_write_texts, pending)
+        return targets
+
+    results = await asyncio.gather(*(_dump_one(entry) for entry in entries))
+    return [target for targets in results for target in targets]
 
 
 def _build_cards_filename(
@@ -500,8 +547,8 @@ def _format_cards_message(paths: List[str]) -> str:
 def _supports_color(state) -> bool:
     if state is None:
         return False
-    modes = state.attributes.get("supported_color_modes") or []
-    return "rgb" in modes or "hs" in modes
+    modes = state.attributes.get("supported_color_modes")
+    return bool(modes) and not _COLOR_MODES.isdisjoint(modes)
 
 
 async def _flash_lights(
@@ -516,25 +563,36 @@ async def _flash_lights(
     if flash_count is None:
         flash_count = max(1, int(duration / interval))
 
+    # Payloads are identical every cycle, so build them once up front.
+    on_color = {"brightness": 255, "rgb_color": color}
+    on_plain = {"brightness": 255}
+    turn_on = [
+        {"entity_id": light, **(on_color if supports_color.get(light) else on_plain)}
+        for light in lights
+    ]
+    turn_off = [{"entity_id": light} for light in lights]
+
     for _ in range(flash_count):
-        for light in lights:
-            data = {"entity_id": light, "brightness": 255}
-            if supports_color.get(light):
-                data["rgb_color"] = color
-            try:
-                await hass.services.async_call("light", "turn_on", data, blocking=True)
-            except Exception:
-                _LOGGER.exception("Failed to turn on flashing light %s", light)
+        await _call_lights(hass, "turn_on", turn_on, "Failed to turn on flashing light %s")
         await asyncio.sleep(interval)
-        for light in lights:
-            try:
-                await hass.services.async_call("light", "turn_off", {"entity_id": light}, blocking=True)
-            except Exception:
-                _LOGGER.exception("Failed to turn off flashing light %s", light)
+        await _call_lights(hass, "turn_off", turn_off, "Failed to turn off flashing light %s")
         await asyncio.sleep(interval)
 
 
+async def _call_lights(hass: HomeAssistant, service: str, payloads: List[dict], error_msg: str) -> None:
+    """Issue light service calls concurrently, logging each failure on its own."""
+    results = await asyncio.gather(
+        *(hass.services.async_call("light", service, data, blocking=True) for data in payloads),
+        return_exceptions=True,
+    )
+    for data, result in zip(payloads, results):
+        if isinstance(result, Exception):
+            _LOGGER.error(error_msg, data["entity_id"], exc_info=result)
+
+
 async def _restore_lights(hass: HomeAssistant, states: dict) -> None:
+    restore_on: List[dict] = []
+    restore_off: List[dict] = []
     for entity_id, state in states.items():
         if state is None:
             continue
@@ -551,12 +609,10 @@ async def _restore_lights(hass: HomeAssistant, states: dict) -> None:
                 data["color_temp"] = attrs.get("color_temp")
             if "effect" in attrs:
                 data["effect"] = attrs.get("effect")
-            try:
-                await hass.services.async_call("light", "turn_on", data, blocking=True)
-            except Exception:
-                _LOGGER.exception("Failed to restore light state for %s", entity_id)
+            restore_on.append(data)
         else:
-            try:
-                await hass.services.async_call("light", "turn_off", {"entity_id": entity_id}, blocking=True)
-            except Exception:
-                _LOGGER.exception("Failed to restore light off state for %s", entity_id)
+            restore_off.append({"entity_id": entity_id})
+    await asyncio.gather(
+        _call_lights(hass, "turn_on", restore_on, "Failed to restore light state for %s"),
+        _call_lights(hass, "turn_off", restore_off, "Failed to restore light off state for %s"),
+    )
@@ -31,6 +31,29 @@ BASE_SWITCH_KEYS = [
 
 DEFAULT_ON = {"air_control_enabled"}
 
+# Every HI switch belongs to the same device; HA only reads this mapping.
+_SHARED_DEVICE_INFO = DeviceInfo(
+    identifiers={(DOMAIN, "hi")},
+    name="Humidity Intelligence",
+    manufacturer="Humidity Intelligence",
+)
+
+_BASE_SWITCH_LABELS = {key: f"HI {key.replace('_', ' ').title()}" for key in BASE_SWITCH_KEYS}
+
+
+class _LabelMap(dict):
+    """Trigger labels that title-case (and remember) unknown trigger types."""
+
+    def __missing__(self, key: str) -> str:
+        value = key.replace("_", " ").title()
+        self[key] = value
+        return value
+
+
+_TRIGGER_LABELS = _LabelMap(
+    {key: spec.get("label") or key.replace("_", " ").title() for key, spec in ALERT_TRIGGER_DEFS.items()}
+)
+
 
 class HIInputSwitch(SwitchEntity, RestoreEntity):
     """Simple switch-like helper for HI UI compatibility."""
@@ -46,15 +69,11 @@ class HIInputSwitch(SwitchEntity, RestoreEntity):
         self._entry_id = entry_id
         self._key = key
         self._state = key in DEFAULT_ON
-        self._attr_name = name or f"HI {key.replace('_', ' ').title()}"
+        self._attr_name = name or _BASE_SWITCH_LABELS.get(key) or f"HI {key.replace('_', ' ').title()}"
         self._attr_unique_id = f"hi_{entry_id}_input_{key}"
         self._attr_extra_state_attributes = attrs or {}
-        self._auto_close_task: asyncio.Task | None = None
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, "hi")},
-            name="Humidity Intelligence",
-            manufacturer="Humidity Intelligence",
-        )
+        self._auto_close_handle: asyncio.TimerHandle | None = None
+        self._attr_device_info = _SHARED_DEVICE_INFO
 
     @property
     def should_poll(self) -> bool:
@@ -72,9 +91,7 @@ class HIInputSwitch(SwitchEntity, RestoreEntity):
                 self._schedule_auto_close()
 
     async def async_will_remove_from_hass(self) -> None:
-        if self._auto_close_task:
-            self._auto_close_task.cancel()
-            self._auto_close_task = None
+        self._cancel_auto_close()
 
     async def async_turn_on(self, **kwargs) -> None:
         self._state = True
@@ -84,28 +101,29 @@ class HIInputSwitch(SwitchEntity, RestoreEntity):
 
     async def async_turn_off(self, **kwargs) -> None:
         self._state = False
-        if self._auto_close_task:
-            self._auto_close_task.cancel()
-            self._auto_close_task = None
+        self._cancel_auto_close()
         self.async_write_ha_state()
 
     def _supports_auto_close(self) -> bool:
         return self._key.endswith("_expanded") or self._key == "toggle"
 
     def _schedule_auto_close(self) -> None:
-        if self._auto_close_task:
-            self._auto_close_task.cancel()
+        self._cancel_auto_close()
+        self._auto_close_handle = self.hass.loop.call_later(
+            UI_DROPDOWN_AUTO_CLOSE_SECONDS,
+            self._do_auto_close,
+        )
 
-        async def _auto_close() -> None:
-            try:
-                await asyncio.sleep(UI_DROPDOWN_AUTO_CLOSE_SECONDS)
-                if self._state:
-                    self._state = False
-                    self.async_write_ha_state()
-            except asyncio.CancelledError:
-                return
+    def _cancel_auto_close(self) -> None:
+        if self._auto_close_handle:
+            self._auto_close_handle.cancel()
+            self._auto_close_handle = None
 
-        self._auto_close_task = asyncio.create_task(_auto_close())
+    def _do_auto_close(self) -> None:
+        self._auto_close_handle = None
+        if self._state:
+            self._state = False
+            self.async_write_ha_state()
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities) -> None:
@@ -138,10 +156,7 @@ def _alert_switch_definitions(entry: ConfigEntry) -> List[Tuple[int, str, str, D
     alerts = _resolved_alerts(entry)
     for idx, alert in enumerate(alerts[:MAX_ALERTS], start=1):
         trigger_type = str(alert.get("trigger_type") or "unknown")
-        trigger_label = ALERT_TRIGGER_DEFS.get(trigger_type, {}).get(
-            "label",
-            trigger_type.replace("_", " ").title(),
-        )
+        trigger_label = _TRIGGER_LABELS[trigger_type]
         threshold = alert.get("threshold")
         threshold_suffix = f" @ {threshold}" if threshold not in (None, "") else ""
         name = f"HI Alert {idx} {trigger_label}{threshold_suffix} Active"
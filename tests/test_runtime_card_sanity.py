@@ -3,21 +3,40 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import copy
+import functools
 import importlib.util
 import pathlib
 import sys
 import types
-from types import MethodType, SimpleNamespace
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup
+    uvloop = None
 
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 ENTRY_ID = "entry123"
 PKG = "hi_testpkg"
+_STUB_SENTINEL = "_hi_test_stub"
+
+# (module name, path) -> (mtime_ns, module); only changed files are re-executed.
+_MODULE_CACHE: dict[tuple[str, pathlib.Path], tuple[int, types.ModuleType]] = {}
+# Use uvloop when it is installed; otherwise asyncio's default loop.
+_LOOP_FACTORY = uvloop.new_event_loop if uvloop is not None else None
 
 
 def _install_homeassistant_stubs() -> None:
     """Install lightweight Home Assistant stubs into sys.modules."""
+    if getattr(sys.modules.get("homeassistant"), _STUB_SENTINEL, False):
+        return
     ha = types.ModuleType("homeassistant")
+    setattr(ha, _STUB_SENTINEL, True)
     core = types.ModuleType("homeassistant.core")
     config_entries = types.ModuleType("homeassistant.config_entries")
     helpers = types.ModuleType("homeassistant.helpers")
@@ -52,7 +71,10 @@ def _install_homeassistant_stubs() -> None:
 
 def _install_package_scaffold() -> None:
     """Create importable package namespace used for file-based module loading."""
+    if getattr(sys.modules.get(PKG), _STUB_SENTINEL, False):
+        return
     pkg = types.ModuleType(PKG)
+    setattr(pkg, _STUB_SENTINEL, True)
     pkg.__path__ = [str(ROOT)]
     sys.modules[PKG] = pkg
 
@@ -67,11 +89,17 @@ def _install_package_scaffold() -> None:
 
 
 def _load_module(name: str, path: pathlib.Path):
+    mtime = path.stat().st_mtime_ns
+    cached = _MODULE_CACHE.get((name, path))
+    if cached and cached[0] == mtime:
+        sys.modules[name] = cached[1]
+        return cached[1]
     spec = importlib.util.spec_from_file_location(name, str(path))
     module = importlib.util.module_from_spec(spec)
     assert spec and spec.loader
     sys.modules[name] = module
     spec.loader.exec_module(module)
+    _MODULE_CACHE[(name, path)] = (mtime, module)
     return module
 
 
@@ -86,180 +114,298 @@ def _load_target_modules():
 
 
 class _FakeState:
+    __slots__ = ("state", "attributes")
+
     def __init__(self, state, attrs=None):
         self.state = str(state)
         self.attributes = attrs or {}
 
 
 class _FakeStates:
-    def __init__(self, values):
-        self._values = dict(values)
+    __slots__ = ("_values", "get")
 
-    def get(self, entity_id):
-        return self._values.get(entity_id)
+    def __init__(self, values):
+        # Entity ids contain "." so the compiler does not intern them; do it once here.
+        self._values = {sys.intern(entity_id): state for entity_id, state in values.items()}
+        # Bound dict lookup avoids a Python frame per engine state read.
+        self.get = self._values.get
 
     def is_state(self, entity_id, state):
         st = self._values.get(entity_id)
         return bool(st and st.state == state)
 
 
+class _Ready:
+    """Already-resolved awaitable; lets fakes skip coroutine creation entirely."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def __await__(self):
+        return self._value
+        yield  # pragma: no cover - marks this as a generator
+
+
+_DONE = _Ready()
+
+
+class _StubTask:
+    """Never-finishing task stand-in; the engine only calls ``done()`` and ``cancel()``."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def done(self):
+        return False
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+
 class _FakeServices:
     def __init__(self):
         self.calls = []
+        # (domain, service, entity_id) index of calls, plus the latest payload per key.
+        self._seen: set[tuple[str, str, str | None]] = set()
+        self._seen_full: dict[tuple[str, str, str | None], dict] = {}
 
     def has_service(self, domain, service):
         return True
 
-    async def async_call(self, domain, service, data=None, blocking=False):
-        self.calls.append((domain, service, dict(data or {}), bool(blocking)))
+    def async_call(self, domain, service, data=None, blocking=False):
+        payload = dict(data or {})
+        self.calls.append((domain, service, payload, bool(blocking)))
+        entity_ids = payload.get("entity_id")
+        # HA accepts a single id or a list of ids; index one key per id.
+        if entity_ids is None or isinstance(entity_ids, str):
+            entity_ids = (entity_ids,)
+        domain, service = sys.intern(domain), sys.intern(service)
+        for entity_id in entity_ids:
+            key = (domain, service, sys.intern(entity_id) if type(entity_id) is str else entity_id)
+            self._seen.add(key)
+            self._seen_full[key] = payload
+        return _DONE
 
 
 class _FakeBool:
     def __init__(self, initial=False):
         self.is_on = bool(initial)
 
-    async def async_turn_on(self):
+    def async_turn_on(self):
         self.is_on = True
+        return _DONE
 
-    async def async_turn_off(self):
+    def async_turn_off(self):
         self.is_on = False
+        return _DONE
 
 
 class _FakeTimer:
     def __init__(self):
         self.native_value = "idle"
 
-    async def async_start(self, duration):
+    def async_start(self, duration):
         self.native_value = "active"
+        return _DONE
 
-    async def async_cancel(self):
+    def async_cancel(self):
         self.native_value = "idle"
+        return _DONE
 
 
 class _FakeConfigEntries:
+    __slots__ = ("_by_id", "async_get_entry")
+
     def __init__(self, entry):
-        self._entry = entry
+        self._by_id = {entry.entry_id: entry}
+        self.async_get_entry = self._by_id.get
 
-    def async_get_entry(self, entry_id):
-        return self._entry if entry_id == self._entry.entry_id else None
+
+@functools.lru_cache(maxsize=None)
+def _registry_entity_id(domain, unique_id):
+    suffix = unique_id.split("_", 2)[-1]
+    return f"{domain}.hi_{suffix}"
 
 
 class _FakeRegistry:
     def async_get_entity_id(self, domain, _integration, unique_id):
-        suffix = unique_id.split("_", 2)[-1]
-        return f"{domain}.hi_{suffix}"
+        return _registry_entity_id(domain, unique_id)
+
+
+# Stateless, so one instance serves every er.async_get() call.
+_FIXED_REGISTRY = _FakeRegistry()
 
 
 class _FakeHass:
+    _BOOL_DEFAULTS = {
+        "air_control_enabled": True,
+        "air_control_manual_override": False,
+        "air_isolate_fan_outputs": False,
+        "air_isolate_humidifier_outputs": False,
+        "air_co_emergency_active": False,
+        "air_downstairs_humidifier_active": False,
+        "air_upstairs_humidifier_active": False,
+        "air_aq_downstairs_active": False,
+        "air_aq_upstairs_active": False,
+        "air_alert_1_active": False,
+        "air_alert_2_active": False,
+        "air_alert_3_active": False,
+        "air_alert_4_active": False,
+        "air_alert_5_active": False,
+    }
+    _TIMER_NAMES = ("air_control_pause", "air_aq_downstairs_run", "air_aq_upstairs_run")
+
     def __init__(self, entry, states):
         self.services = _FakeServices()
+        self._bools = {key: _FakeBool(initial) for key, initial in self._BOOL_DEFAULTS.items()}
+        self._timers = {key: _FakeTimer() for key in self._TIMER_NAMES}
+        self.reset(entry, states)
+
+    def reset(self, entry, states):
+        """Return this hass to a freshly-constructed state for ``entry`` without reallocating the fakes."""
         self.states = _FakeStates(states)
+        self.services.calls.clear()
+        self.services._seen.clear()
+        self.services._seen_full.clear()
+        for key, initial in self._BOOL_DEFAULTS.items():
+            self._bools[key].is_on = initial
+        for timer in self._timers.values():
+            timer.native_value = "idle"
         self.config_entries = _FakeConfigEntries(entry)
         self.data = {
             "humidity_intelligence": {
                 entry.entry_id: {
-                    "hi_input_booleans": {
-                        "air_control_enabled": _FakeBool(True),
-                        "air_control_manual_override": _FakeBool(False),
-                        "air_isolate_fan_outputs": _FakeBool(False),
-                        "air_isolate_humidifier_outputs": _FakeBool(False),
-                        "air_co_emergency_active": _FakeBool(False),
-                        "air_downstairs_humidifier_active": _FakeBool(False),
-                        "air_upstairs_humidifier_active": _FakeBool(False),
-                        "air_aq_downstairs_active": _FakeBool(False),
-                        "air_aq_upstairs_active": _FakeBool(False),
-                        "air_alert_1_active": _FakeBool(False),
-                        "air_alert_2_active": _FakeBool(False),
-                        "air_alert_3_active": _FakeBool(False),
-                        "air_alert_4_active": _FakeBool(False),
-                        "air_alert_5_active": _FakeBool(False),
-                    },
-                    "hi_timers": {
-                        "air_control_pause": _FakeTimer(),
-                        "air_aq_downstairs_run": _FakeTimer(),
-                        "air_aq_upstairs_run": _FakeTimer(),
-                    },
+                    "hi_input_booleans": self._bools,
+                    "hi_timers": self._timers,
                 }
             }
         }
+        return self
 
-    async def async_add_executor_job(self, func, *args):
-        return func(*args)
+    def async_add_executor_job(self, func, *args):
+        return _Ready(func(*args))
 
 
-def _wrap_async_method(obj, method_name: str, trace: list[str]) -> None:
-    original = getattr(obj, method_name)
+def _ib(hass, key):
+    """The fake input boolean the engine sees for ``key``."""
+    return hass.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"][key]
 
-    async def wrapped(self, *args, **kwargs):
-        if method_name == "_handle_zone_by_key" and args:
-            trace.append(f"{method_name}:{args[0]}")
-        else:
-            trace.append(method_name)
-        return await original(*args, **kwargs)
 
-    setattr(obj, method_name, MethodType(wrapped, obj))
+_TRACED_METHODS = ("_handle_alerts", "_handle_humidifiers", "_handle_zone_by_key", "_handle_aq")
 
 
-def _base_entry_data():
-    return {
-        "telemetry": [
-            {"entity_id": "sensor.kitchen_h", "sensor_type": "humidity", "level": "level1", "room": "Kitchen"},
-            {"entity_id": "sensor.hall_h", "sensor_type": "humidity", "level": "level1", "room": "Hallway"},
-            {"entity_id": "sensor.bed_h", "sensor_type": "humidity", "level": "level2", "room": "Bedroom"},
-            {"entity_id": "sensor.kitchen_t", "sensor_type": "temperature", "level": "level1", "room": "Kitchen"},
-            {"entity_id": "sensor.hall_t", "sensor_type": "temperature", "level": "level1", "room": "Hallway"},
-            {"entity_id": "sensor.bed_t", "sensor_type": "temperature", "level": "level2", "room": "Bedroom"},
-            {"entity_id": "sensor.l1_iaq", "sensor_type": "iaq", "level": "level1", "room": "Hallway"},
-            {"entity_id": "sensor.co_val", "sensor_type": "co", "level": "level1", "room": "Kitchen"},
-        ],
-        "zones": {
-            "zone1": {
-                "enabled": True,
-                "level": "level1",
-                "rooms": ["Kitchen"],
-                "outputs": ["fan.zone1"],
-                "triggers": ["humidity_high"],
-                "thresholds": {"humidity_high": 5},
-                "ui_label": "Cooking",
-            },
-            "zone2": {
-                "enabled": True,
-                "level": "level2",
-                "rooms": ["Bedroom"],
-                "outputs": ["fan.zone2"],
-                "triggers": ["humidity_high"],
-                "thresholds": {"humidity_high": 2},
-                "ui_label": "Bathroom",
-            },
-        },
-        "humidifiers": {
-            "level1": {"enabled": True, "outputs": ["humidifier.l1"], "band_adjust": 0},
+def _trace(name: str):
+    """Record calls on engines that opted in by setting ``_trace`` to a list."""
+
+    def deco(fn):
+        async def wrapped(self, *args, **kwargs):
+            trace = self.__dict__.get("_trace")
+            if trace is not None:
+                trace.append(f"{name}:{args[0]}" if name == "_handle_zone_by_key" and args else name)
+            return await fn(self, *args, **kwargs)
+
+        return wrapped
+
+    return deco
+
+
+@contextlib.contextmanager
+def _traced_engine_class(engine_cls):
+    """Patch the lane handlers on the engine class once, restoring them afterwards."""
+    originals = {name: engine_cls.__dict__[name] for name in _TRACED_METHODS}
+    try:
+        for name, fn in originals.items():
+            setattr(engine_cls, name, _trace(name)(fn))
+        yield engine_cls
+    finally:
+        for name, fn in originals.items():
+            setattr(engine_cls, name, fn)
+
+
+# Built once at import; consumers get their own deep copy.
+_BASE_ENTRY_TEMPLATE = {
+    "telemetry": [
+        {"entity_id": "sensor.kitchen_h", "sensor_type": "humidity", "level": "level1", "room": "Kitchen"},
+        {"entity_id": "sensor.hall_h", "sensor_type": "humidity", "level": "level1", "room": "Hallway"},
+        {"entity_id": "sensor.bed_h", "sensor_type": "humidity", "level": "level2", "room": "Bedroom"},
+        {"entity_id": "sensor.kitchen_t", "sensor_type": "temperature", "level": "level1", "room": "Kitchen"},
+        {"entity_id": "sensor.hall_t", "sensor_type": "temperature", "level": "level1", "room": "Hallway"},
+        {"entity_id": "sensor.bed_t", "sensor_type": "temperature", "level": "level2", "room": "Bedroom"},
+        {"entity_id": "sensor.l1_iaq", "sensor_type": "iaq", "level": "level1", "room": "Hallway"},
+        {"entity_id": "sensor.co_val", "sensor_type": "co", "level": "level1", "room": "Kitchen"},
+    ],
+    "zones": {
+        "zone1": {
+            "enabled": True,
+            "level": "level1",
+            "rooms": ["Kitchen"],
+            "outputs": ["fan.zone1"],
+            "triggers": ["humidity_high"],
+            "thresholds": {"humidity_high": 5},
+            "ui_label": "Cooking",
         },
-        "aq": {
-            "level1": {
-                "enabled": True,
-                "outputs": ["fan.aq1"],
-                "triggers": ["iaq_bad"],
-                "thresholds": {"iaq_bad": 75},
-                "output_level": 66,
-                "run_duration": 10,
-            }
+        "zone2": {
+            "enabled": True,
+            "level": "level2",
+            "rooms": ["Bedroom"],
+            "outputs": ["fan.zone2"],
+            "triggers": ["humidity_high"],
+            "thresholds": {"humidity_high": 2},
+            "ui_label": "Bathroom",
         },
-        "alerts": [
-            {
-                "enabled": True,
-                "trigger_type": "custom_binary",
-                "custom_trigger": "binary_sensor.test_alert",
-                "power_entity": "switch.alert_power",
-                "lights": ["light.alert"],
-                "flash_mode": "red",
-                "duration": 10,
-            }
-        ],
-    }
+    },
+    "humidifiers": {
+        "level1": {"enabled": True, "outputs": ["humidifier.l1"], "band_adjust": 0},
+    },
+    "aq": {
+        "level1": {
+            "enabled": True,
+            "outputs": ["fan.aq1"],
+            "triggers": ["iaq_bad"],
+            "thresholds": {"iaq_bad": 75},
+            "output_level": 66,
+            "run_duration": 10,
+        }
+    },
+    "alerts": [
+        {
+            "enabled": True,
+            "trigger_type": "custom_binary",
+            "custom_trigger": "binary_sensor.test_alert",
+            "power_entity": "switch.alert_power",
+            "lights": ["light.alert"],
+            "flash_mode": "red",
+            "duration": 10,
+        }
+    ],
+}
 
 
-async def _run_runtime_assertions(engine_mod) -> None:
+def _base_entry_data():
+    return copy.deepcopy(_BASE_ENTRY_TEMPLATE)
+
+
+def _entry_with(overrides):
+    """Deep-copy the base entry and apply dotted-path overrides (e.g. ``"zones.zone1.enabled"``)."""
+    data = _base_entry_data()
+    for path, value in overrides.items():
+        *parents, leaf = path.split(".")
+        target = data
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        if isinstance(target, list):
+            target[int(leaf)] = value
+        else:
+            target[leaf] = value
+    return data
+
+
+async def _scenario_co_emergency_preempts_lanes(engine_mod) -> None:
     HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # CO emergency preemption: must short-circuit lower lanes.
@@ -279,14 +425,16 @@ async def _run_runtime_assertions(engine_mod) -> None:
         },
     )
     engine_co = HIAutomationEngine(hass_co, entry)
-    co_trace = []
-    for method in ("_handle_alerts", "_handle_humidifiers", "_handle_zone_by_key", "_handle_aq"):
-        _wrap_async_method(engine_co, method, co_trace)
+    co_trace = engine_co._trace = []
     await engine_co._evaluate()
 
     assert co_trace == []
     assert hass_co.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "co_emergency"
 
+
+async def _scenario_co_emergency_configured_outputs(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # CO emergency should respect configured threshold/output entities (from alert config)
     # and stand down non-selected outputs.
     entry_co_cfg_data = _base_entry_data()
@@ -319,23 +467,25 @@ async def _run_runtime_assertions(engine_mod) -> None:
     engine_co_cfg = HIAutomationEngine(hass_co_cfg, entry_co_cfg)
     await engine_co_cfg._evaluate()
     assert hass_co_cfg.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "co_emergency"
-    assert any(
-        domain == "fan" and service == "set_percentage" and data.get("entity_id") == "fan.zone1"
-        for domain, service, data, _ in hass_co_cfg.services.calls
-    )
+    seen = hass_co_cfg.services._seen
+    assert ("fan", "set_percentage", "fan.zone1") in seen
     # Non-selected outputs should be returned to auto while CO lane is active.
-    assert any(
-        domain == "fan" and service == "set_preset_mode" and data.get("entity_id") in {"fan.zone2", "fan.aq1"}
-        for domain, service, data, _ in hass_co_cfg.services.calls
-    )
+    assert ("fan", "set_preset_mode", "fan.zone2") in seen or ("fan", "set_preset_mode", "fan.aq1") in seen
+
+
+async def _scenario_co_emergency_threshold_floor(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # Safe-threshold enforcement: CO emergency threshold is clamped to minimum safe value.
     # With threshold configured as 1 and CO at 8, emergency should not trigger.
-    entry_co_guard_data = _base_entry_data()
-    entry_co_guard_data["zones"]["zone1"]["enabled"] = False
-    entry_co_guard_data["zones"]["zone2"]["enabled"] = False
-    entry_co_guard_data["aq"] = {}
-    entry_co_guard_data["humidifiers"] = {}
+    entry_co_guard_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "aq": {},
+            "humidifiers": {},
+        }
+    )
     entry_co_guard_data["alerts"] = [
         {
             "enabled": True,
@@ -366,6 +516,10 @@ async def _run_runtime_assertions(engine_mod) -> None:
     await engine_co_guard._evaluate()
     assert hass_co_guard.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") != "co_emergency"
 
+
+async def _scenario_alert_lane_exclusive(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # Alert lane is now exclusive: no humidifier/zone/AQ handling should run.
     entry2 = SimpleNamespace(entry_id=ENTRY_ID, data=_base_entry_data(), options={})
     hass = _FakeHass(
@@ -383,41 +537,43 @@ async def _run_runtime_assertions(engine_mod) -> None:
         },
     )
     engine = HIAutomationEngine(hass, entry2)
-    trace = []
-    for method in ("_handle_alerts", "_handle_humidifiers", "_handle_zone_by_key", "_handle_aq"):
-        _wrap_async_method(engine, method, trace)
+    trace = engine._trace = []
     await engine._evaluate()
 
     assert trace == ["_handle_alerts"]
     assert "_handle_aq" not in trace
 
-    calls = hass.services.calls
-    assert any(domain == "humidity_intelligence" and service == "flash_lights" for domain, service, *_ in calls)
-    assert not hass.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on
-    assert not any(
-        domain == "fan" and service == "set_percentage" and data.get("entity_id") in {"fan.zone1", "fan.zone2"}
-        for domain, service, data, _ in calls
-    )
-    assert not any(
-        domain == "fan" and service == "set_percentage" and data.get("entity_id") == "fan.aq1"
-        for domain, service, data, _ in calls
-    )
+    seen = hass.services._seen
+    assert any(domain == "humidity_intelligence" and service == "flash_lights" for domain, service, _ in seen)
+    assert not _ib(hass, "air_downstairs_humidifier_active").is_on
+    assert ("fan", "set_percentage", "fan.zone1") not in seen
+    assert ("fan", "set_percentage", "fan.zone2") not in seen
+    assert ("fan", "set_percentage", "fan.aq1") not in seen
 
     # Runtime mode priority should prefer alert while alert lane is active.
     assert hass.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "alert"
-    assert hass.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_alert_1_active"].is_on
+    assert _ib(hass, "air_alert_1_active").is_on
     alert_reason = hass.data["humidity_intelligence"][ENTRY_ID].get("runtime_reason", "")
     assert "Alert response is active" in alert_reason
     assert "All other lanes are paused" in alert_reason
 
+    await _cancel_aq_tasks(engine)
+
+
+async def _scenario_zone_label_and_fan_step(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # Zone label and fan-step enforcement: custom UI label should be surfaced,
     # and unsupported percentages should snap to the nearest supported level.
-    entry_label_data = _base_entry_data()
-    entry_label_data["alerts"][0]["enabled"] = False
-    entry_label_data["zones"]["zone1"]["ui_label"] = "Kitchen Extract"
-    entry_label_data["zones"]["zone1"]["output_level"] = 64
-    entry_label_data["zones"]["zone2"]["enabled"] = False
-    entry_label_data["aq"] = {}
+    entry_label_data = _entry_with(
+        {
+            "alerts.0.enabled": False,
+            "zones.zone1.ui_label": "Kitchen Extract",
+            "zones.zone1.output_level": 64,
+            "zones.zone2.enabled": False,
+            "aq": {},
+        }
+    )
     entry_label = SimpleNamespace(entry_id=ENTRY_ID, data=entry_label_data, options={})
     hass_label = _FakeHass(
         entry_label,
@@ -438,19 +594,20 @@ async def _run_runtime_assertions(engine_mod) -> None:
 
     assert hass_label.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "cooking"
     assert hass_label.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode_display") == "Kitchen Extract"
-    assert any(
-        domain == "fan"
-        and service == "set_percentage"
-        and data.get("entity_id") == "fan.zone1"
-        and data.get("percentage") == 66
-        for domain, service, data, _ in hass_label.services.calls
-    )
+    assert hass_label.services._seen_full[("fan", "set_percentage", "fan.zone1")]["percentage"] == 66
+
+
+async def _scenario_aq_only_lane(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # AQ-only scenario: no alert and no zone should allow AQ lane execution.
-    entry3_data = _base_entry_data()
-    entry3_data["zones"]["zone1"]["enabled"] = False
-    entry3_data["zones"]["zone2"]["enabled"] = False
-    entry3_data["alerts"][0]["enabled"] = False
+    entry3_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+        }
+    )
     # Overlap AQ output with a zone output to ensure AQ is not immediately reset to auto.
     entry3_data["aq"]["level1"]["outputs"] = ["fan.zone1"]
     entry3 = SimpleNamespace(entry_id=ENTRY_ID, data=entry3_data, options={})
@@ -469,31 +626,32 @@ async def _run_runtime_assertions(engine_mod) -> None:
         },
     )
     engine_aq = HIAutomationEngine(hass_aq, entry3)
-    aq_trace = []
-    for method in ("_handle_alerts", "_handle_humidifiers", "_handle_zone_by_key", "_handle_aq"):
-        _wrap_async_method(engine_aq, method, aq_trace)
+    aq_trace = engine_aq._trace = []
     await engine_aq._evaluate()
 
     assert "_handle_aq" in aq_trace
-    assert any(
-        domain == "fan" and service == "set_percentage" and data.get("entity_id") == "fan.zone1"
-        for domain, service, data, _ in hass_aq.services.calls
-    )
-    assert not any(
-        domain == "fan" and service == "set_preset_mode" and data.get("entity_id") == "fan.zone1"
-        for domain, service, data, _ in hass_aq.services.calls
-    )
+    assert ("fan", "set_percentage", "fan.zone1") in hass_aq.services._seen
+    assert ("fan", "set_preset_mode", "fan.zone1") not in hass_aq.services._seen
     assert hass_aq.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "air_quality"
     aq_reason = hass_aq.data["humidity_intelligence"][ENTRY_ID].get("runtime_reason", "")
     assert "AQ is active" in aq_reason or "Air-quality assist is active" in aq_reason
     assert "Trigger detail:" in aq_reason
 
+    await _cancel_aq_tasks(engine_aq)
+
+
+async def _scenario_aq_auto_uses_preset(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # AQ auto level should use fan preset mode instead of percentage service.
-    entry_aq_auto_data = _base_entry_data()
-    entry_aq_auto_data["zones"]["zone1"]["enabled"] = False
-    entry_aq_auto_data["zones"]["zone2"]["enabled"] = False
-    entry_aq_auto_data["alerts"][0]["enabled"] = False
-    entry_aq_auto_data["aq"]["level1"]["output_level"] = "auto"
+    entry_aq_auto_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+            "aq.level1.output_level": "auto",
+        }
+    )
     entry_aq_auto = SimpleNamespace(entry_id=ENTRY_ID, data=entry_aq_auto_data, options={})
     hass_aq_auto = _FakeHass(
         entry_aq_auto,
@@ -511,20 +669,23 @@ async def _run_runtime_assertions(engine_mod) -> None:
     )
     engine_aq_auto = HIAutomationEngine(hass_aq_auto, entry_aq_auto)
     await engine_aq_auto._evaluate()
-    assert any(
-        domain == "fan" and service == "set_preset_mode" and data.get("entity_id") == "fan.aq1"
-        for domain, service, data, _ in hass_aq_auto.services.calls
-    )
-    assert not any(
-        domain == "fan" and service == "set_percentage" and data.get("entity_id") == "fan.aq1"
-        for domain, service, data, _ in hass_aq_auto.services.calls
-    )
+    assert ("fan", "set_preset_mode", "fan.aq1") in hass_aq_auto.services._seen
+    assert ("fan", "set_percentage", "fan.aq1") not in hass_aq_auto.services._seen
+
+    await _cancel_aq_tasks(engine_aq_auto)
+
+
+async def _scenario_shared_aq_output(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # Independent AQ lanes sharing one output: both can run; newest trigger wins output level.
-    entry_shared_aq_data = _base_entry_data()
-    entry_shared_aq_data["zones"]["zone1"]["enabled"] = False
-    entry_shared_aq_data["zones"]["zone2"]["enabled"] = False
-    entry_shared_aq_data["alerts"][0]["enabled"] = False
+    entry_shared_aq_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+        }
+    )
     entry_shared_aq_data["telemetry"].append(
         {"entity_id": "sensor.l2_iaq", "sensor_type": "iaq", "level": "level2", "room": "Bedroom"}
     )
@@ -564,32 +725,29 @@ async def _run_runtime_assertions(engine_mod) -> None:
     )
     engine_shared_aq = HIAutomationEngine(hass_shared_aq, entry_shared_aq)
     await engine_shared_aq._evaluate()
-    assert any(
-        domain == "fan"
-        and service == "set_percentage"
-        and data.get("entity_id") == "fan.shared"
-        and data.get("percentage") == 33
-        for domain, service, data, _ in hass_shared_aq.services.calls
-    )
+    assert hass_shared_aq.services._seen_full[("fan", "set_percentage", "fan.shared")]["percentage"] == 33
     # New level2 trigger arrives later: shared output should move to level2 setting.
-    hass_shared_aq.states._values["sensor.l2_iaq"] = _FakeState(70)
+    hass_shared_aq.states.get("sensor.l2_iaq").state = "70"
     await engine_shared_aq._evaluate()
-    assert hass_shared_aq.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_aq_downstairs_active"].is_on
-    assert hass_shared_aq.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_aq_upstairs_active"].is_on
-    assert any(
-        domain == "fan"
-        and service == "set_percentage"
-        and data.get("entity_id") == "fan.shared"
-        and data.get("percentage") == 100
-        for domain, service, data, _ in hass_shared_aq.services.calls
-    )
+    assert _ib(hass_shared_aq, "air_aq_downstairs_active").is_on
+    assert _ib(hass_shared_aq, "air_aq_upstairs_active").is_on
+    assert hass_shared_aq.services._seen_full[("fan", "set_percentage", "fan.shared")]["percentage"] == 100
+
+    await _cancel_aq_tasks(engine_shared_aq)
+
+
+async def _scenario_shared_humidifier_output(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # Shared humidifier output follows last trigger transition while lanes remain independent.
-    entry_shared_humid_data = _base_entry_data()
-    entry_shared_humid_data["zones"]["zone1"]["enabled"] = False
-    entry_shared_humid_data["zones"]["zone2"]["enabled"] = False
-    entry_shared_humid_data["alerts"][0]["enabled"] = False
-    entry_shared_humid_data["aq"] = {}
+    entry_shared_humid_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+            "aq": {},
+        }
+    )
     entry_shared_humid_data["humidifiers"] = {
         "level1": {"enabled": True, "outputs": ["humidifier.shared"], "band_adjust": 0},
         "level2": {"enabled": True, "outputs": ["humidifier.shared"], "band_adjust": 0},
@@ -611,26 +769,28 @@ async def _run_runtime_assertions(engine_mod) -> None:
     )
     engine_shared_humid = HIAutomationEngine(hass_shared_humid, entry_shared_humid)
     await engine_shared_humid._evaluate()
-    assert hass_shared_humid.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on
-    assert hass_shared_humid.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_upstairs_humidifier_active"].is_on
+    assert _ib(hass_shared_humid, "air_downstairs_humidifier_active").is_on
+    assert _ib(hass_shared_humid, "air_upstairs_humidifier_active").is_on
     # Level1 recovers: its off transition becomes the newest command on shared output.
-    hass_shared_humid.states._values["sensor.kitchen_h"] = _FakeState(55)
-    hass_shared_humid.states._values["sensor.hall_h"] = _FakeState(55)
+    hass_shared_humid.states.get("sensor.kitchen_h").state = "55"
+    hass_shared_humid.states.get("sensor.hall_h").state = "55"
     await engine_shared_humid._evaluate()
-    assert any(
-        domain == "humidifier"
-        and service == "turn_off"
-        and data.get("entity_id") == "humidifier.shared"
-        for domain, service, data, _ in hass_shared_humid.services.calls
-    )
-    assert not hass_shared_humid.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on
-    assert hass_shared_humid.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_upstairs_humidifier_active"].is_on
+    assert ("humidifier", "turn_off", "humidifier.shared") in hass_shared_humid.services._seen
+    assert not _ib(hass_shared_humid, "air_downstairs_humidifier_active").is_on
+    assert _ib(hass_shared_humid, "air_upstairs_humidifier_active").is_on
+
+
+async def _scenario_isolation_toggles(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # Testing isolation toggles suppress output service calls while logic state still updates.
-    entry_isolated_data = _base_entry_data()
-    entry_isolated_data["alerts"][0]["enabled"] = False
-    entry_isolated_data["zones"]["zone2"]["enabled"] = False
-    entry_isolated_data["aq"] = {}
+    entry_isolated_data = _entry_with(
+        {
+            "alerts.0.enabled": False,
+            "zones.zone2.enabled": False,
+            "aq": {},
+        }
+    )
     entry_isolated = SimpleNamespace(entry_id=ENTRY_ID, data=entry_isolated_data, options={})
     hass_isolated = _FakeHass(
         entry_isolated,
@@ -646,23 +806,31 @@ async def _run_runtime_assertions(engine_mod) -> None:
             "binary_sensor.test_alert": _FakeState("off"),
         },
     )
-    hass_isolated.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_isolate_fan_outputs"].is_on = True
-    hass_isolated.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_isolate_humidifier_outputs"].is_on = True
+    _ib(hass_isolated, "air_isolate_fan_outputs").is_on = True
+    _ib(hass_isolated, "air_isolate_humidifier_outputs").is_on = True
     engine_isolated = HIAutomationEngine(hass_isolated, entry_isolated)
     await engine_isolated._evaluate()
     assert hass_isolated.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "cooking"
     isolated_reason = hass_isolated.data["humidity_intelligence"][ENTRY_ID].get("runtime_reason", "")
     assert "isolated for testing" in isolated_reason
+    output_services = {"set_percentage", "set_preset_mode", "turn_on", "turn_off"}
     assert not any(
-        domain in {"fan", "switch", "humidifier"} and service in {"set_percentage", "set_preset_mode", "turn_on", "turn_off"}
-        for domain, service, data, _ in hass_isolated.services.calls
+        domain in {"fan", "switch", "humidifier"} and service in output_services
+        for domain, service, _ in hass_isolated.services._seen
     )
 
+
+async def _scenario_stale_aq_state_cleared(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # Stale AQ state from an old level config must be cleared (prevents AQ badge/mode drift).
-    entry4_data = _base_entry_data()
-    entry4_data["zones"]["zone1"]["enabled"] = False
-    entry4_data["zones"]["zone2"]["enabled"] = False
-    entry4_data["alerts"][0]["enabled"] = False
+    entry4_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+        }
+    )
     entry4_data["aq"] = {
         "level1": {
             "enabled": False,
@@ -688,22 +856,32 @@ async def _run_runtime_assertions(engine_mod) -> None:
             "binary_sensor.test_alert": _FakeState("off"),
         },
     )
-    hass_stale.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_aq_upstairs_active"].is_on = True
+    _ib(hass_stale, "air_aq_upstairs_active").is_on = True
     engine_stale = HIAutomationEngine(hass_stale, entry4)
-    engine_stale._aq_tasks["level2"] = asyncio.create_task(asyncio.sleep(3600))
+    stale_task = engine_stale._aq_tasks["level2"] = _StubTask()
     await engine_stale._evaluate()
 
-    assert not hass_stale.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_aq_upstairs_active"].is_on
+    assert not _ib(hass_stale, "air_aq_upstairs_active").is_on
     assert "level2" not in engine_stale._aq_tasks
+    assert stale_task.cancelled
     assert hass_stale.data["humidity_intelligence"][ENTRY_ID].get("runtime_mode") == "normal"
 
+    await _cancel_aq_tasks(engine_stale)
+
+
+async def _scenario_global_gate_mode(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # Global gate should publish dedicated runtime mode for UI chip/border sync.
-    entry_gate_data = _base_entry_data()
-    entry_gate_data["alerts"][0]["enabled"] = False
-    entry_gate_data["zones"]["zone1"]["enabled"] = False
-    entry_gate_data["zones"]["zone2"]["enabled"] = False
-    entry_gate_data["aq"] = {}
-    entry_gate_data["humidifiers"] = {}
+    entry_gate_data = _entry_with(
+        {
+            "alerts.0.enabled": False,
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "aq": {},
+            "humidifiers": {},
+        }
+    )
     entry_gate_data["presence_gate"] = {
         "enabled": True,
         "entities": ["binary_sensor.home_presence"],
@@ -733,13 +911,20 @@ async def _run_runtime_assertions(engine_mod) -> None:
     gate_reason = hass_gate.data["humidity_intelligence"][ENTRY_ID].get("runtime_reason", "")
     assert "Presence gate is active" in gate_reason
 
+
+async def _scenario_disabled_humidifier_lane(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
+
     # Disabled humidifier lanes should clear stale active state and turn outputs off.
-    entry5_data = _base_entry_data()
-    entry5_data["zones"]["zone1"]["enabled"] = False
-    entry5_data["zones"]["zone2"]["enabled"] = False
-    entry5_data["alerts"][0]["enabled"] = False
-    entry5_data["aq"] = {}
-    entry5_data["humidifiers"]["level1"]["enabled"] = False
+    entry5_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+            "aq": {},
+            "humidifiers.level1.enabled": False,
+        }
+    )
     entry5 = SimpleNamespace(entry_id=ENTRY_ID, data=entry5_data, options={})
     hass_humid = _FakeHass(
         entry5,
@@ -755,22 +940,26 @@ async def _run_runtime_assertions(engine_mod) -> None:
             "binary_sensor.test_alert": _FakeState("off"),
         },
     )
-    hass_humid.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on = True
+    _ib(hass_humid, "air_downstairs_humidifier_active").is_on = True
     engine_humid = HIAutomationEngine(hass_humid, entry5)
     await engine_humid._evaluate()
 
-    assert not hass_humid.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on
-    assert any(
-        domain == "humidifier" and service == "turn_off" and data.get("entity_id") == "humidifier.l1"
-        for domain, service, data, _ in hass_humid.services.calls
-    )
+    assert not _ib(hass_humid, "air_downstairs_humidifier_active").is_on
+    assert ("humidifier", "turn_off", "humidifier.l1") in hass_humid.services._seen
+
+
+async def _scenario_humidifier_band_recovery(engine_mod) -> None:
+    HIAutomationEngine = engine_mod.HIAutomationEngine
 
     # Humidifier off threshold should recover inside target band (low + 4%), not only at high target.
-    entry6_data = _base_entry_data()
-    entry6_data["zones"]["zone1"]["enabled"] = False
-    entry6_data["zones"]["zone2"]["enabled"] = False
-    entry6_data["alerts"][0]["enabled"] = False
-    entry6_data["aq"] = {}
+    entry6_data = _entry_with(
+        {
+            "zones.zone1.enabled": False,
+            "zones.zone2.enabled": False,
+            "alerts.0.enabled": False,
+            "aq": {},
+        }
+    )
     entry6 = SimpleNamespace(entry_id=ENTRY_ID, data=entry6_data, options={})
     hass_humid_band = _FakeHass(
         entry6,
@@ -787,46 +976,37 @@ async def _run_runtime_assertions(engine_mod) -> None:
         },
     )
     # Simulate humidifier already running; at 50% in winter, it should now shut off at low+4.
-    hass_humid_band.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on = True
+    _ib(hass_humid_band, "air_downstairs_humidifier_active").is_on = True
     engine_humid_band = HIAutomationEngine(hass_humid_band, entry6)
     await engine_humid_band._evaluate()
-    assert not hass_humid_band.data["humidity_intelligence"][ENTRY_ID]["hi_input_booleans"]["air_downstairs_humidifier_active"].is_on
-    assert any(
-        domain == "humidifier" and service == "turn_off" and data.get("entity_id") == "humidifier.l1"
-        for domain, service, data, _ in hass_humid_band.services.calls
-    )
+    assert not _ib(hass_humid_band, "air_downstairs_humidifier_active").is_on
+    assert ("humidifier", "turn_off", "humidifier.l1") in hass_humid_band.services._seen
 
-    # Cleanup background AQ tasks.
-    for task in list(engine._aq_tasks.values()):
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
-    for task in list(engine_aq._aq_tasks.values()):
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
-    for task in list(engine_stale._aq_tasks.values()):
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
-    for task in list(engine_aq_auto._aq_tasks.values()):
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
-    for task in list(engine_shared_aq._aq_tasks.values()):
+
+async def _cancel_aq_tasks(*engines) -> None:
+    """Cancel background AQ run tasks left by a scenario and drain them in one gather."""
+    tasks = [task for engine in engines for task in engine._aq_tasks.values()]
+    for task in tasks:
         task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+RUNTIME_SCENARIOS = [
+    _scenario_co_emergency_preempts_lanes,
+    _scenario_co_emergency_configured_outputs,
+    _scenario_co_emergency_threshold_floor,
+    _scenario_alert_lane_exclusive,
+    _scenario_zone_label_and_fan_step,
+    _scenario_aq_only_lane,
+    _scenario_aq_auto_uses_preset,
+    _scenario_shared_aq_output,
+    _scenario_shared_humidifier_output,
+    _scenario_isolation_toggles,
+    _scenario_stale_aq_state_cleared,
+    _scenario_global_gate_mode,
+    _scenario_disabled_humidifier_lane,
+    _scenario_humidifier_band_recovery,
+]
 
 
 def _contains_v2_border_pill_sync_logic(yaml_text: str) -> bool:
@@ -855,7 +1035,7 @@ def _contains_v2_border_pill_sync_logic(yaml_text: str) -> bool:
 
 
 async def _run_card_assertions(register_mod) -> None:
-    sys.modules["homeassistant.helpers.entity_registry"].async_get = lambda hass: _FakeRegistry()
+    sys.modules["homeassistant.helpers.entity_registry"].async_get = lambda hass, _r=_FIXED_REGISTRY: _r
 
     entry = SimpleNamespace(
         entry_id=ENTRY_ID,
@@ -924,11 +1104,45 @@ async def _run_card_assertions(register_mod) -> None:
     assert "input_boolean.air_isolate_humidifier_outputs" not in cards.get("v2_tablet", "")
 
 
-def test_runtime_lane_order_and_service_simulation():
+@pytest.fixture(scope="module")
+def runner():
+    """One event loop for the whole module instead of a fresh loop per test."""
+    with asyncio.Runner(loop_factory=_LOOP_FACTORY) as module_runner:
+        yield module_runner
+
+
+@pytest.fixture(scope="module")
+def engine_mod():
     engine_mod, _ = _load_target_modules()
-    asyncio.run(_run_runtime_assertions(engine_mod))
+    with _traced_engine_class(engine_mod.HIAutomationEngine):
+        yield engine_mod
+
 
+@pytest.mark.parametrize(
+    "scenario",
+    RUNTIME_SCENARIOS,
+    ids=lambda scenario: scenario.__name__.removeprefix("_scenario_"),
+)
+def test_runtime_lane_order_and_service_simulation(scenario, engine_mod, runner):
+    runner.run(scenario(engine_mod))
 
-def test_card_render_sanity_and_placeholder_resolution():
+
+def test_card_render_sanity_and_placeholder_resolution(runner):
     _, register_mod = _load_target_modules()
-    asyncio.run(_run_card_assertions(register_mod))
+    runner.run(_run_card_assertions(register_mod))
+
+
+def test_prune_unresolved_entity_items_preserves_line_endings():
+    _, register_mod = _load_target_modules()
+    content = (
+        "cards:\r\n"
+        "  - entity: light.alert_2\r\n"
+        "    name: Alert light 2\r\n"
+        "\r\n"
+        "  - entity: light.alert_1\r\n"
+        "    name: Alert light 1\r\n"
+    )
+    pruned = register_mod._prune_unresolved_entity_items(content, ["light.alert_2"])
+    assert pruned == "cards:\r\n  - entity: light.alert_1\r\n    name: Alert light 1\r\n"
+    # Nothing to prune returns the card untouched.
+    assert register_mod._prune_unresolved_entity_items(content, ["light.alert_5"]) is content
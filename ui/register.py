@@ -8,8 +8,10 @@ will need to interact with the frontend when the API becomes stable.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
+from functools import lru_cache
 from typing import Any, Dict, List
 
 from homeassistant.core import HomeAssistant
@@ -22,37 +24,113 @@ _LOGGER = logging.getLogger(__name__)
 
 from pathlib import Path
 
+# (placeholder, domain, unique_id suffix) for entities created by this integration.
+_ENTITY_PLACEHOLDERS: tuple[tuple[str, str, str], ...] = (
+    ("sensor.house_average_humidity", "sensor", "house_avg_humidity"),
+    ("sensor.house_average_temperature", "sensor", "house_avg_temperature"),
+    ("sensor.house_humidity_target_low", "sensor", "house_target_low"),
+    ("sensor.house_humidity_target_high", "sensor", "house_target_high"),
+    ("sensor.house_humidity_drift_7d", "sensor", "house_drift_7d"),
+    ("sensor.worst_room_condensation", "sensor", "worst_condensation"),
+    ("sensor.worst_room_condensation_risk", "sensor", "worst_condensation_risk"),
+    ("sensor.worst_room_mould", "sensor", "worst_mould"),
+    ("sensor.worst_room_mould_risk", "sensor", "worst_mould_risk"),
+    ("sensor.air_control_downstairs_average_humidity", "sensor", "level1_avg_humidity"),
+    ("sensor.air_control_upstairs_average_humidity", "sensor", "level2_avg_humidity"),
+    ("sensor.air_control_house_iaq_average", "sensor", "house_iaq_average"),
+    ("sensor.air_control_downstairs_iaq_average", "sensor", "level1_iaq_average"),
+    ("sensor.air_control_upstairs_iaq_average", "sensor", "level2_iaq_average"),
+    ("sensor.air_control_house_pm25_average", "sensor", "house_pm25_average"),
+    ("sensor.air_control_downstairs_pm25_average", "sensor", "level1_pm25_average"),
+    ("sensor.air_control_upstairs_pm25_average", "sensor", "level2_pm25_average"),
+    ("sensor.air_control_house_voc_average", "sensor", "house_voc_average"),
+    ("sensor.air_control_downstairs_voc_average", "sensor", "level1_voc_average"),
+    ("sensor.air_control_upstairs_voc_average", "sensor", "level2_voc_average"),
+    ("sensor.air_control_house_co_average", "sensor", "house_co_average"),
+    ("sensor.air_control_downstairs_co_average", "sensor", "level1_co_average"),
+    ("sensor.air_control_upstairs_co_average", "sensor", "level2_co_average"),
+    ("sensor.air_control_mode", "sensor", "air_control_mode"),
+    ("sensor.air_control_reason", "sensor", "air_control_reason"),
+    ("sensor.air_control_kitchen_humidity_delta", "sensor", "air_control_kitchen_humidity_delta"),
+    ("sensor.air_control_bathroom_humidity_delta", "sensor", "air_control_bathroom_humidity_delta"),
+    ("sensor.air_control_kitchen_slope_delta", "sensor", "air_control_kitchen_slope_delta"),
+    ("sensor.condensation_danger", "binary_sensor", "condensation_danger"),
+    ("sensor.mould_danger", "binary_sensor", "mould_danger"),
+    ("sensor.humidity_danger", "binary_sensor", "humidity_danger"),
+    ("binary_sensor.condensation_danger", "binary_sensor", "condensation_danger"),
+    ("binary_sensor.humidity_danger", "binary_sensor", "humidity_danger"),
+    ("binary_sensor.mould_danger", "binary_sensor", "mould_danger"),
+)
+
+# input_boolean.<key> placeholders backed by switch.hi_<key>.
+_BOOL_PLACEHOLDER_KEYS: tuple[str, ...] = (
+    "air_aq_downstairs_active",
+    "air_aq_upstairs_active",
+    "air_co_emergency_active",
+    "air_control_enabled",
+    "air_control_manual_override",
+    "air_control_output_expanded",
+    "air_isolate_fan_outputs",
+    "air_isolate_humidifier_outputs",
+    "air_downstairs_humidifier_active",
+    "air_upstairs_humidifier_active",
+    "humidity_constellation_expanded",
+    "toggle",
+)
+
+# timer.<key> placeholders backed by sensor.hi_<key>.
+_TIMER_PLACEHOLDER_KEYS: tuple[str, ...] = (
+    "air_aq_upstairs_run",
+    "air_aq_downstairs_run",
+    "air_bathroom_min_run",
+    "air_cooking_min_run",
+    "air_control_pause",
+)
+
+# A "- entity: <id>" list item line in a card template.
+_ENTITY_ITEM_RE = re.compile(
+    r"^(?P<indent>[ \t]*)-[ \t]*entity:[ \t]*(?P<eid>[^#\s]+)[ \t]*(?:#[^\r\n]*)?\r?$",
+    re.MULTILINE,
+)
+
+# Card template path -> text; templates ship with the integration and only
+# change on upgrade, which needs a restart.
+_TEMPLATE_CACHE: Dict[Path, str] = {}
+
 
 async def async_build_entity_mapping(hass: HomeAssistant, entry_id: str) -> Dict[str, str]:
     """Build mapping from v1 placeholder entity IDs to v2 entity IDs."""
-    registry = er.async_get(hass)
-    mapping: Dict[str, str] = {}
-
     entry = hass.config_entries.async_get_entry(entry_id)
     telemetry = _entry_section(entry, "telemetry", []) if entry else []
     zones = _entry_section(entry, "zones", {}) if entry else {}
     humidifiers = _entry_section(entry, "humidifiers", {}) if entry else {}
     alerts = _entry_section(entry, "alerts", []) if entry else []
 
+    registry = er.async_get(hass)
+    mapping: Dict[str, str] = {}
+
+    # sensor_type -> level (None = any level) -> [(lowercase room, entity_id)] in config order.
+    by_type: Dict[Any, Dict[Any, List[tuple[str, Any]]]] = {}
+    for item in telemetry:
+        row = ((item.get("room") or "").lower(), item.get("entity_id"))
+        levels = by_type.setdefault(item.get("sensor_type"), {})
+        levels.setdefault(None, []).append(row)
+        item_level = item.get("level")
+        if item_level is not None:
+            levels.setdefault(item_level, []).append(row)
+
+    def _telemetry_rows(sensor_type: str, level: str | None) -> List[tuple[str, Any]]:
+        return by_type.get(sensor_type, {}).get(level or None, [])
+
     def _find_telemetry(room_hint: str, sensor_type: str, level: str | None = None) -> str | None:
         room_hint = room_hint.lower()
-        for item in telemetry:
-            if item.get("sensor_type") != sensor_type:
-                continue
-            if level and item.get("level") != level:
-                continue
-            room = (item.get("room") or "").lower()
+        for room, entity_id in _telemetry_rows(sensor_type, level):
             if room_hint in room:
-                return item.get("entity_id")
+                return entity_id
         return None
 
     def _first_telemetry(sensor_type: str, level: str | None = None) -> str | None:
-        for item in telemetry:
-            if item.get("sensor_type") != sensor_type:
-                continue
-            if level and item.get("level") != level:
-                continue
-            entity_id = item.get("entity_id")
+        for _room, entity_id in _telemetry_rows(sensor_type, level):
             if entity_id:
                 return entity_id
         return None
@@ -69,16 +147,17 @@ async def async_build_entity_mapping(hass: HomeAssistant, entry_id: str) -> Dict
         return None
 
     def _zone_outputs(level: str) -> list[str]:
-        out: list[str] = []
+        # dict keys dedupe in O(1) while keeping first-seen order.
+        out: Dict[str, None] = {}
         for zone in (zones or {}).values():
             if not isinstance(zone, dict):
                 continue
             if zone.get("level") != level:
                 continue
             for entity_id in zone.get("outputs", []) or []:
-                if isinstance(entity_id, str) and entity_id not in out:
-                    out.append(entity_id)
-        return out
+                if isinstance(entity_id, str):
+                    out[entity_id] = None
+        return list(out)
 
     def _humidifier_output(level: str) -> str | None:
         cfg = (humidifiers or {}).get(level, {})
@@ -86,26 +165,23 @@ async def async_build_entity_mapping(hass: HomeAssistant, entry_id: str) -> Dict
         return _pick([e for e in outputs if isinstance(e, str)], 0)
 
     def _alert_lights() -> list[str]:
-        out: list[str] = []
+        out: Dict[str, None] = {}
         for alert in alerts or []:
             if not isinstance(alert, dict):
                 continue
             lights = alert.get("lights", []) or []
             for light in lights:
-                if isinstance(light, str) and light not in out:
-                    out.append(light)
-        return out
+                if isinstance(light, str):
+                    out[light] = None
+        return list(out)
+
+    alert_lights = _alert_lights()
 
     def _alert_light_at(index: int) -> str | None:
-        lights = _alert_lights()
-        if len(lights) > index:
-            return lights[index]
+        if len(alert_lights) > index:
+            return alert_lights[index]
         return None
 
-    def _bool_entity_id(key: str) -> str:
-        unique_id = f"hi_{entry_id}_input_{key}"
-        return registry.async_get_entity_id("switch", DOMAIN, unique_id) or f"switch.hi_{key}"
-
     def _alert_active_entity(index: int) -> str | None:
         if index >= len(alerts or []):
             return None
@@ -116,79 +192,37 @@ async def async_build_entity_mapping(hass: HomeAssistant, entry_id: str) -> Dict
             return found
         return f"switch.hi_{key}"
 
-    def _timer_entity_id(key: str) -> str:
-        unique_id = f"hi_{entry_id}_timer_{key}"
-        return registry.async_get_entity_id("sensor", DOMAIN, unique_id) or f"sensor.hi_{key}"
-
-    placeholders = {
-        "sensor.house_average_humidity": _entity_id("sensor", "house_avg_humidity"),
-        "sensor.house_average_temperature": _entity_id("sensor", "house_avg_temperature"),
-        "sensor.house_humidity_target_low": _entity_id("sensor", "house_target_low"),
-        "sensor.house_humidity_target_high": _entity_id("sensor", "house_target_high"),
-        "sensor.house_humidity_drift_7d": _entity_id("sensor", "house_drift_7d"),
-        "sensor.worst_room_condensation": _entity_id("sensor", "worst_condensation"),
-        "sensor.worst_room_condensation_risk": _entity_id("sensor", "worst_condensation_risk"),
-        "sensor.worst_room_mould": _entity_id("sensor", "worst_mould"),
-        "sensor.worst_room_mould_risk": _entity_id("sensor", "worst_mould_risk"),
-        "sensor.air_control_downstairs_average_humidity": _entity_id("sensor", "level1_avg_humidity"),
-        "sensor.air_control_upstairs_average_humidity": _entity_id("sensor", "level2_avg_humidity"),
-        "sensor.air_control_house_iaq_average": _entity_id("sensor", "house_iaq_average"),
-        "sensor.air_control_downstairs_iaq_average": _entity_id("sensor", "level1_iaq_average"),
-        "sensor.air_control_upstairs_iaq_average": _entity_id("sensor", "level2_iaq_average"),
-        "sensor.air_control_house_pm25_average": _entity_id("sensor", "house_pm25_average"),
-        "sensor.air_control_downstairs_pm25_average": _entity_id("sensor", "level1_pm25_average"),
-        "sensor.air_control_upstairs_pm25_average": _entity_id("sensor", "level2_pm25_average"),
-        "sensor.air_control_house_voc_average": _entity_id("sensor", "house_voc_average"),
-        "sensor.air_control_downstairs_voc_average": _entity_id("sensor", "level1_voc_average"),
-        "sensor.air_control_upstairs_voc_average": _entity_id("sensor", "level2_voc_average"),
-        "sensor.air_control_house_co_average": _entity_id("sensor", "house_co_average"),
-        "sensor.air_control_downstairs_co_average": _entity_id("sensor", "level1_co_average"),
-        "sensor.air_control_upstairs_co_average": _entity_id("sensor", "level2_co_average"),
-        "sensor.air_control_mode": _entity_id("sensor", "air_control_mode"),
-        "sensor.air_control_reason": _entity_id("sensor", "air_control_reason"),
-        "sensor.air_control_kitchen_humidity_delta": _entity_id("sensor", "air_control_kitchen_humidity_delta"),
-        "sensor.air_control_bathroom_humidity_delta": _entity_id("sensor", "air_control_bathroom_humidity_delta"),
-        "sensor.air_control_kitchen_slope_delta": _entity_id("sensor", "air_control_kitchen_slope_delta"),
-        "sensor.condensation_danger": _entity_id("binary_sensor", "condensation_danger"),
-        "sensor.mould_danger": _entity_id("binary_sensor", "mould_danger"),
-        "sensor.humidity_danger": _entity_id("binary_sensor", "humidity_danger"),
-        "binary_sensor.condensation_danger": _entity_id("binary_sensor", "condensation_danger"),
-        "binary_sensor.humidity_danger": _entity_id("binary_sensor", "humidity_danger"),
-        "binary_sensor.mould_danger": _entity_id("binary_sensor", "mould_danger"),
-        "input_boolean.air_aq_downstairs_active": _bool_entity_id("air_aq_downstairs_active"),
-        "input_boolean.air_aq_upstairs_active": _bool_entity_id("air_aq_upstairs_active"),
-        "input_boolean.air_alert_1_active": _alert_active_entity(0),
-        "input_boolean.air_alert_2_active": _alert_active_entity(1),
-        "input_boolean.air_alert_3_active": _alert_active_entity(2),
-        "input_boolean.air_alert_4_active": _alert_active_entity(3),
-        "input_boolean.air_alert_5_active": _alert_active_entity(4),
-        "input_boolean.air_co_emergency_active": _bool_entity_id("air_co_emergency_active"),
-        "input_boolean.air_control_enabled": _bool_entity_id("air_control_enabled"),
-        "input_boolean.air_control_manual_override": _bool_entity_id("air_control_manual_override"),
-        "input_boolean.air_control_output_expanded": _bool_entity_id("air_control_output_expanded"),
-        "input_boolean.air_isolate_fan_outputs": _bool_entity_id("air_isolate_fan_outputs"),
-        "input_boolean.air_isolate_humidifier_outputs": _bool_entity_id("air_isolate_humidifier_outputs"),
-        "input_boolean.air_downstairs_humidifier_active": _bool_entity_id("air_downstairs_humidifier_active"),
-        "input_boolean.air_upstairs_humidifier_active": _bool_entity_id("air_upstairs_humidifier_active"),
-        "input_boolean.humidity_constellation_expanded": _bool_entity_id("humidity_constellation_expanded"),
-        "input_boolean.toggle": _bool_entity_id("toggle"),
-        "timer.air_aq_upstairs_run": _timer_entity_id("air_aq_upstairs_run"),
-        "timer.air_aq_downstairs_run": _timer_entity_id("air_aq_downstairs_run"),
-        "timer.air_bathroom_min_run": _timer_entity_id("air_bathroom_min_run"),
-        "timer.air_cooking_min_run": _timer_entity_id("air_cooking_min_run"),
-        "timer.air_control_pause": _timer_entity_id("air_control_pause"),
-        "fan.kitchen_air": _pick(_zone_outputs("level1"), 0),
-        "fan.living_room_air": _pick(_zone_outputs("level1"), 1),
-        "fan.upstairs_air": _pick(_zone_outputs("level2"), 0),
-        "humidifier.downstairs_humidifier": _humidifier_output("level1"),
-        "humidifier.upstairs_humidifier": _humidifier_output("level2"),
-        "light.bathroom": _alert_light_at(0),
-        "light.alert_1": _alert_light_at(0),
-        "light.alert_2": _alert_light_at(1),
-        "light.alert_3": _alert_light_at(2),
-        "light.alert_4": _alert_light_at(3),
-        "light.alert_5": _alert_light_at(4),
+    get_entity_id = registry.async_get_entity_id
+    prefix = f"hi_{entry_id}_"
+    placeholders: Dict[str, str | None] = {
+        placeholder: get_entity_id(domain, DOMAIN, prefix + suffix)
+        for placeholder, domain, suffix in _ENTITY_PLACEHOLDERS
     }
+    for key in _BOOL_PLACEHOLDER_KEYS:
+        placeholders[f"input_boolean.{key}"] = (
+            get_entity_id("switch", DOMAIN, f"{prefix}input_{key}") or f"switch.hi_{key}"
+        )
+    for index in range(5):
+        placeholders[f"input_boolean.air_alert_{index + 1}_active"] = _alert_active_entity(index)
+    for key in _TIMER_PLACEHOLDER_KEYS:
+        placeholders[f"timer.{key}"] = (
+            get_entity_id("sensor", DOMAIN, f"{prefix}timer_{key}") or f"sensor.hi_{key}"
+        )
+    placeholders.update(
+        {
+            "fan.kitchen_air": _pick(_zone_outputs("level1"), 0),
+            "fan.living_room_air": _pick(_zone_outputs("level1"), 1),
+            "fan.upstairs_air": _pick(_zone_outputs("level2"), 0),
+            "humidifier.downstairs_humidifier": _humidifier_output("level1"),
+            "humidifier.upstairs_humidifier": _humidifier_output("level2"),
+            "light.bathroom": _alert_light_at(0),
+            "light.alert_1": _alert_light_at(0),
+            "light.alert_2": _alert_light_at(1),
+            "light.alert_3": _alert_light_at(2),
+            "light.alert_4": _alert_light_at(3),
+            "light.alert_5": _alert_light_at(4),
+        }
+    )
 
     # Room-based sensor placeholders
     fallback_house_humidity = _entity_id("sensor", "house_avg_humidity")
@@ -300,45 +334,57 @@ async def async_register_cards(hass: HomeAssistant, entry_id: str, mapping: Dict
         "v1_mobile": base_path / "v1_mobile.yaml",
         "view_cards_button": base_path / "view_cards_button.yaml",
     }
-    cards: Dict[str, str] = {}
     unresolved = list(
         (hass.data.get(DOMAIN, {}).get(entry_id, {}) or {}).get("unresolved_placeholders", [])
     )
-    unresolved_by_card: Dict[str, List[str]] = {}
-    for name, path in card_files.items():
+    resolved = [placeholder for placeholder, entity_id in mapping.items() if entity_id]
+    required_unresolved = frozenset(p for p in unresolved if not _is_optional_placeholder(p))
+    required_unresolved_re = _ph_union(required_unresolved) if required_unresolved else None
+
+    async def _process_card(name: str, path: Path) -> tuple[str, str | None, List[str]]:
         try:
-            content = await hass.async_add_executor_job(path.read_text, "utf-8")
+            content = await _async_read_template(hass, path)
         except Exception as exc:
             _LOGGER.error("Unable to read template %s: %s", path, exc)
-            continue
-        # Replace placeholders safely (avoid partial matches like binary_sensor.*)
-        for placeholder, entity_id in mapping.items():
-            if not entity_id:
-                continue
-            pattern = rf"(?<![A-Za-z0-9_]){re.escape(placeholder)}(?![A-Za-z0-9_])"
-            content = re.sub(pattern, entity_id, content)
+            return name, None, []
+        # Only placeholders that literally occur can match; a substring check is far cheaper
+        # than widening the alternation with ones this card never uses.
+        present = frozenset(placeholder for placeholder in resolved if placeholder in content)
+        # Replace all placeholders in one pass (avoid partial matches like binary_sensor.*)
+        if present:
+            content = _ph_union(present).sub(lambda m: mapping[m.group(1)], content)
 
         content = _prune_unresolved_entity_items(content, unresolved)
 
-        unresolved_in_card: List[str] = []
-        for placeholder in unresolved:
-            if _is_optional_placeholder(placeholder):
-                continue
-            pattern = rf"(?<![A-Za-z0-9_]){re.escape(placeholder)}(?![A-Za-z0-9_])"
-            if re.search(pattern, content):
-                unresolved_in_card.append(placeholder)
+        unresolved_in_card: List[str] = (
+            sorted({m.group(1) for m in required_unresolved_re.finditer(content)})
+            if required_unresolved_re
+            else []
+        )
+        return name, content, unresolved_in_card
+
+    # Cards are independent; read and substitute them concurrently.
+    results = await asyncio.gather(
+        *(_process_card(name, path) for name, path in card_files.items())
+    )
+
+    cards: Dict[str, str] = {}
+    unresolved_by_card: Dict[str, List[str]] = {}
+    for name, content, unresolved_in_card in results:
+        if content is None:
+            continue
         if unresolved_in_card:
-            unresolved_by_card[name] = sorted(unresolved_in_card)
+            unresolved_by_card[name] = unresolved_in_card
             _LOGGER.error(
                 "Card %s has unresolved placeholders for entry %s: %s",
                 name,
                 entry_id,
-                ", ".join(sorted(unresolved_in_card)),
+                ", ".join(unresolved_in_card),
             )
             warning = (
                 "# HI WARNING: unresolved placeholders detected and kept as-is:\n"
                 "# "
-                + ", ".join(sorted(unresolved_in_card))
+                + ", ".join(unresolved_in_card)
                 + "\n"
             )
             content = warning + content
@@ -349,6 +395,30 @@ async def async_register_cards(hass: HomeAssistant, entry_id: str, mapping: Dict
     return cards
 
 
+async def _async_read_template(hass: HomeAssistant, path: Path) -> str:
+    """Return a card template, hopping to the executor only on first load."""
+    if (cached := _TEMPLATE_CACHE.get(path)) is not None:
+        return cached
+    return await hass.async_add_executor_job(_read_template, path)
+
+
+def _read_template(path: Path) -> str:
+    content = path.read_text("utf-8")
+    _TEMPLATE_CACHE[path] = content
+    return content
+
+
+@lru_cache(maxsize=64)
+def _ph_union(placeholders: frozenset[str]) -> re.Pattern[str]:
+    """Compiled whole-token alternation matching any of ``placeholders``.
+
+    Longest placeholders come first so a shorter one never shadows a longer
+    one sharing its prefix (``..._quality`` vs ``..._quality_2``).
+    """
+    alternatives = "|".join(re.escape(p) for p in sorted(placeholders, key=lambda p: (-len(p), p)))
+    return re.compile(rf"(?<![A-Za-z0-9_])({alternatives})(?![A-Za-z0-9_])")
+
+
 def _is_optional_placeholder(placeholder: str) -> bool:
     """Placeholders that are expected to be user-provided outputs are optional."""
     return placeholder.startswith(
@@ -375,42 +445,31 @@ def _prune_unresolved_entity_items(content: str, unresolved: List[str]) -> str:
     if not prune_set:
         return content
 
-    lines = content.splitlines()
-    out: List[str] = []
-    i = 0
-    entity_pattern = re.compile(r"^([ \t]*)-[ \t]*entity:[ \t]*([^#\s]+)[ \t]*(?:#.*)?$")
-
-    while i < len(lines):
-        line = lines[i]
-        match = entity_pattern.match(line)
-        if not match:
-            out.append(line)
-            i += 1
+    kept: List[str] = []
+    pos = 0
+    for match in _ENTITY_ITEM_RE.finditer(content):
+        if match.start() < pos or match.group("eid") not in prune_set:
             continue
+        # Drop this list item and its child mapping lines (plus the line break ending them).
+        end = _entity_children_re(len(match.group("indent"))).match(content, match.end()).end()
+        if content.startswith("\r\n", end):
+            end += 2
+        elif content.startswith("\n", end):
+            end += 1
+        kept.append(content[pos:match.start()])
+        pos = end
+    if not kept:
+        return content
+    kept.append(content[pos:])
+    return "".join(kept)
 
-        entity_id = match.group(2)
-        if entity_id not in prune_set:
-            out.append(line)
-            i += 1
-            continue
 
-        # Drop this list item and its child mapping lines.
-        base_indent = len(match.group(1))
-        i += 1
-        while i < len(lines):
-            nxt = lines[i]
-            if not nxt.strip():
-                i += 1
-                continue
-            indent = len(nxt) - len(nxt.lstrip(" \t"))
-            if indent <= base_indent:
-                break
-            i += 1
-
-    result = "\n".join(out)
-    if content.endswith("\n"):
-        result += "\n"
-    return result
+@lru_cache(maxsize=32)
+def _entity_children_re(base_indent: int) -> re.Pattern[str]:
+    """Blank lines and lines indented deeper than ``base_indent`` following an item line."""
+    return re.compile(
+        rf"(?:\r?\n(?:[ \t]*(?=\r?\n|\Z)|[ \t]{{{base_indent + 1},}}[^\r\n]*))*"
+    )
 
 
 def _entry_section(entry: Any, key: str, default: Any) -> Any: